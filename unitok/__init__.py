@@ -1,7 +1,7 @@
 from unitok.utils import Verbose, warning, error, info, debug
 from unitok.utils import Symbol, Symbols
 from unitok.utils import JsonHandler, PickleHandler
-from unitok.utils import Instance, Space, Map
+from unitok.utils import Instance, Space, Map, Cache
 
 from unitok.utils.hub import Hub, ParamHub
 from unitok.vocabulary import Vocab, Vocabulary, VocabHub, VocabularyHub
@@ -12,6 +12,7 @@ from unitok.tokenizer import SplitTokenizer, DigitTokenizer, DigitsTokenizer
 from unitok.tokenizer import GloVeTokenizer
 from unitok.job import Job, JobHub
 from unitok.feature import Feature, FeatureHub
+from unitok.observer import BaseObserver, TimingObserver, MemoryObserver, ProfileObserver
 
 from unitok.utils.index_set import IndexSet, VocabSet, TokenizerSet, JobSet, FeatureSet
 
@@ -24,7 +25,7 @@ __all__ = [
     'Verbose', 'warning', 'error', 'info', 'debug',
     'Symbol', 'Symbols',
     'JsonHandler', 'PickleHandler',
-    'Instance', 'Space', 'Map',
+    'Instance', 'Space', 'Map', 'Cache',
     'Hub', 'ParamHub',
     'Vocab', 'Vocabulary', 'VocabHub', 'VocabularyHub',
     'BaseTokenizer', 'TokenizerHub',
@@ -34,6 +35,7 @@ __all__ = [
     'GloVeTokenizer',
     'Job', 'JobHub',
     'Feature', 'FeatureHub',
+    'BaseObserver', 'TimingObserver', 'MemoryObserver', 'ProfileObserver',
     'IndexSet', 'VocabSet', 'TokenizerSet', 'JobSet', 'FeatureSet',
     'Meta',
     'Status',
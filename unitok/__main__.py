@@ -1,12 +1,12 @@
 import argparse
 
-import pandas as pd
 from pigmento import pnt
 
 from unitok import Vocab
 from unitok.tokenizer import BaseTokenizer
 from unitok.unitok import UniTok
 from unitok.utils.class_pool import ClassPool
+from unitok.utils.reader import Readers, CsvReader
 
 
 def integrate():
@@ -20,6 +20,7 @@ def integrate():
     parser.add_argument('--tokenizer', '-t', type=str, default=None, help='tokenizer classname')
     parser.add_argument('--tokenizer_id', type=str, default=None, help='tokenizer id')
     parser.add_argument('--truncate', type=int, help='truncate length', default=None)
+    parser.add_argument('--read_size', type=int, help='maximum number of rows read at a time', default=100_000)
     args, unknown_args = parser.parse_known_args()
 
     tokenizer_params = dict()
@@ -33,14 +34,12 @@ def integrate():
         elif arg.startswith('--tokenizer.'):
             current_param = arg[12:]
 
-    if args.file.endswith('.csv') or args.file.endswith('.tsv'):
-        df = pd.read_csv(args.file, sep='\t')
-    elif args.file.endswith('.parquet'):
-        df = pd.read_parquet(args.file)
-    else:
-        raise ValueError(f'Unsupported file format: {args.file}')
+    # only the column of the new feature is read, chunk by chunk while the previous chunk is tokenized
+    reader_class = Readers.get_class(args.file)
+    reader_params = dict(sep='\t') if reader_class is CsvReader else dict()
 
-    with UniTok.load(args.path, tokenizer_lib=args.lib) as ut:
+    # existing features are not read, as only the files of the new feature are written
+    with UniTok.load(args.path, tokenizer_lib=args.lib, mmap=True, lazy=True) as ut:
         tokenizer = None
 
         if args.tokenizer_id:
@@ -70,7 +69,7 @@ def integrate():
             tokenizer = tokenizers[args.tokenizer](vocab=args.vocab, **tokenizer_params)
 
         ut.add_feature(tokenizer=tokenizer, column=args.column, name=args.name, truncate=args.truncate)
-        ut.tokenize(df).save(args.path)
+        ut.tokenize_file(args.file, read_size=args.read_size, **reader_params).save(args.path)
 
 
 def summarize():
@@ -78,7 +77,7 @@ def summarize():
     parser.add_argument('path', type=str, default='.', help='path to a unitok data directory')
     args, _ = parser.parse_known_args()
 
-    with UniTok.load(args.path) as ut:
+    with UniTok.load(args.path, lazy=True) as ut:
         ut.summarize()
 
 
@@ -88,7 +87,7 @@ def remove():
     parser.add_argument('--name', type=str, help='feature name to remove')
     args, _ = parser.parse_known_args()
 
-    with UniTok.load(args.path) as ut:
+    with UniTok.load(args.path, mmap=True, lazy=True) as ut:
         ut.remove_feature(args.name)
         ut.save(args.path)
 
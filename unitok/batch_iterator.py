@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class BatchIterator:
+    """
+    Batches of samples of a UniTok table, assembled by UniTok.get_batch in worker threads ahead of the consumer
+    Throughput counters of the last iteration tell whether data loading is the bottleneck,
+    i.e., the consumer waits for the batches for most of the elapsed time
+    """
+
+    def __init__(
+            self,
+            ut,
+            batch_size: int,
+            shuffle: bool = False,
+            seed: int = None,
+            drop_last: bool = False,
+            num_workers: int = 0,
+            prefetch: int = None,
+            **kwargs,
+    ):
+        """
+        :param ut: UniTok table
+        :param kwargs: Parameters of UniTok.get_batch, i.e., features, pad, pad_value and dtype
+        """
+        if batch_size <= 0:
+            raise ValueError(f'batch_size should be positive, but {batch_size} is given')
+        if num_workers < 0:
+            raise ValueError(f'num_workers should be non-negative, but {num_workers} is given')
+        if prefetch is not None and prefetch <= 0:
+            raise ValueError(f'prefetch should be positive, but {prefetch} is given')
+
+        self.ut = ut
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.num_workers = num_workers
+        self.prefetch = prefetch or max(num_workers * 2, 1)
+        self.kwargs = kwargs
+        self.rng = np.random.default_rng(seed)
+
+        self.batches = 0
+        self.samples = 0
+        self.assemble_time = 0.0  # time spent on assembling batches, summed over workers
+        self.wait_time = 0.0  # time the consumer waits for the next batch
+        self.elapsed_time = 0.0
+        self._lock = threading.Lock()
+
+    def _get_indices(self):
+        order = np.arange(len(self.ut))
+        if self.shuffle:
+            self.rng.shuffle(order)
+        end = len(order) - len(order) % self.batch_size if self.drop_last else len(order)
+        return [order[start:start + self.batch_size] for start in range(0, end, self.batch_size)]
+
+    def _assemble(self, indices):
+        start = time.perf_counter()
+        batch = self.ut.get_batch(indices, **self.kwargs)
+        with self._lock:
+            self.assemble_time += time.perf_counter() - start
+        return batch
+
+    def _reset(self):
+        self.batches = self.samples = 0
+        self.assemble_time = self.wait_time = self.elapsed_time = 0.0
+
+    def __len__(self):
+        if self.drop_last:
+            return len(self.ut) // self.batch_size
+        return (len(self.ut) + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self):
+        self._reset()
+        batches = self._get_indices()
+        # the empty batch validates the parameters and reads lazily loaded features before the workers start
+        self.ut.get_batch(np.arange(0), **self.kwargs)
+
+        start = time.perf_counter()
+        for indices, batch in self._produce(batches):
+            self.batches += 1
+            self.samples += len(indices)
+            self.elapsed_time = time.perf_counter() - start
+            yield batch
+        self.elapsed_time = time.perf_counter() - start
+
+    def _produce(self, batches):
+        if not self.num_workers:
+            for indices in batches:
+                wait_start = time.perf_counter()
+                batch = self._assemble(indices)
+                self.wait_time += time.perf_counter() - wait_start
+                yield indices, batch
+            return
+
+        batches = iter(batches)
+        futures = deque()
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            try:
+                for indices in batches:
+                    futures.append((indices, executor.submit(self._assemble, indices)))
+                    if len(futures) >= self.prefetch:
+                        break
+                while futures:
+                    indices, future = futures.popleft()
+                    wait_start = time.perf_counter()
+                    batch = future.result()
+                    self.wait_time += time.perf_counter() - wait_start
+                    for next_indices in batches:
+                        futures.append((next_indices, executor.submit(self._assemble, next_indices)))
+                        break
+                    yield indices, batch
+            finally:
+                # batches assembled ahead are dropped when the consumer stops early
+                for _, future in futures:
+                    future.cancel()
+
+    @property
+    def samples_per_second(self):
+        return self.samples / self.elapsed_time if self.elapsed_time else 0.0
+
+    @property
+    def wait_ratio(self):
+        """
+        Fraction of the elapsed time the consumer waits for batches, close to 1 when data loading is the bottleneck
+        """
+        return self.wait_time / self.elapsed_time if self.elapsed_time else 0.0
+
+    def json(self):
+        return dict(
+            batches=self.batches,
+            samples=self.samples,
+            assemble_time=self.assemble_time,
+            wait_time=self.wait_time,
+            elapsed_time=self.elapsed_time,
+            samples_per_second=self.samples_per_second,
+            wait_ratio=self.wait_ratio,
+        )
+
+    def __str__(self):
+        return (f'BatchIterator(batches={self.batches}, samples={self.samples}, '
+                f'samples_per_second={self.samples_per_second:.1f}, wait_ratio={self.wait_ratio:.2%})')
+
+    def __repr__(self):
+        return str(self)
@@ -4,7 +4,7 @@ from unitok import TokenizerHub, VocabHub
 from unitok.tokenizer.union_tokenizer import UnionTokenizer
 
 from unitok.tokenizer import BaseTokenizer
-from unitok.utils import Symbols, Instance
+from unitok.utils import Symbols, Instance, function
 from unitok.utils.hub import Hub
 
 
@@ -42,6 +42,13 @@ class Feature:
     def return_list(self):
         return self.truncate is not None
 
+    @property
+    def dtype(self):
+        """
+        Storage dtype of the token ids, which is widened as the vocabulary grows
+        """
+        return function.get_dtype(len(self.tokenizer.vocab))
+
     def clone(self, **kwargs):
         attributes = {'tokenizer', 'column', 'name', 'truncate', 'order', 'key', 'max_len'}
         params = dict()
@@ -72,17 +79,12 @@ class Feature:
             'order': self.order,
             'key': self.key,
             'max_len': self.max_len,
+            'dtype': str(self.dtype),
         }
 
     @staticmethod
     def get_slice(truncate):
-        if truncate is None:
-            truncate = 0
-        if truncate > 0:
-            return slice(0, truncate)
-        if truncate < 0:
-            return slice(truncate, None)
-        return slice(None)
+        return function.get_slice(truncate)
 
 
 class FeatureHub(Hub[Feature]):
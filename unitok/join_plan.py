@@ -0,0 +1,97 @@
+from typing import Optional
+
+import numpy as np
+
+
+class JoinStep:
+    def __init__(self, ut, parent: Optional[int], key: Optional[str], names: list):
+        """
+        :param ut: Table whose features are gathered in this step
+        :param parent: Step of the table that is soft-unioned with this table, None for the root table
+        :param key: Union key feature of the parent table, whose token ids are the rows of this table
+        :param names: Features gathered from this table
+        """
+        self.ut = ut
+        self.parent = parent
+        self.key = key
+        self.names = names
+
+
+class JoinPlan:
+    """
+    Soft-union joins of a table for the selected features, flattened into steps of tables,
+    e.g., interaction -> user -> region, which is computed once for a selection and reused for batches
+    Each step gathers the union keys of its parent, and the features of its table only once for each distinct key
+    """
+
+    def __init__(self, ut, names: list, candidates: tuple = None):
+        """
+        :param ut: Root table
+        :param names: Selected features
+        :param candidates: Loaded features of the root table when the plan is computed, to detect outdated plans
+        """
+        self.candidates = candidates
+        self.names = names
+        self.steps = []
+        self._plan(ut, None, None, names)
+
+    def _plan(self, ut, parent: Optional[int], key: Optional[str], names: list):
+        step = len(self.steps)
+        self.steps.append(JoinStep(ut, parent, key, [name for name in names if name in ut.data]))
+
+        pending = [name for name in names if name not in ut.data]
+        for feature, others in ut._soft_unions.items():
+            for other in others:
+                other_names = other._get_loaded_names()
+                wanted = [name for name in pending if name in other_names]
+                # unions whose features are not selected are not joined
+                if not wanted:
+                    continue
+                if feature.return_list:
+                    raise ValueError(f'soft union by list feature {feature.name} is not supported in batches')
+                self._plan(other, step, feature.name, wanted)
+                pending = [name for name in pending if name not in wanted]
+
+        if pending:
+            raise ValueError(f'features {", ".join(pending)} are not tokenized or loaded')
+
+    def gather(self, rows: np.ndarray) -> dict:
+        """
+        :param rows: Row indices of the root table
+        :return: token arrays of the selected features for the rows
+        """
+        arrays = dict()
+        # rows of each step, the inverse indices from the root rows to them, and the arrays gathered at them
+        step_rows, step_inverses, step_arrays = [], [], []
+        for step in self.steps:
+            if step.parent is None:
+                rows_, inverse = rows, None
+            else:
+                parent_rows, parent_inverse = step_rows[step.parent], step_inverses[step.parent]
+                keys = step_arrays[step.parent].get(step.key)
+                if keys is None:
+                    keys = self.steps[step.parent].ut._gather(step.key, parent_rows)
+                # key ids of the other table are its row indices, shifted by its loaded row range
+                keys = keys.astype(np.int64) - step.ut._row_offset
+                if keys.size and (keys.min() < 0 or keys.max() >= step.ut._sample_size):
+                    raise ValueError(f'union keys of {step.key} are not in the loaded rows of {step.ut}')
+                rows_, key_inverse = np.unique(keys, return_inverse=True)
+                inverse = key_inverse if parent_inverse is None else key_inverse[parent_inverse]
+
+            gathered = {name: step.ut._gather(name, rows_) for name in step.names}
+            step_rows.append(rows_)
+            step_inverses.append(inverse)
+            step_arrays.append(gathered)
+
+            for name, arrays_ in gathered.items():
+                if inverse is not None:
+                    arrays_ = step.ut._get_column_class(name).take(arrays_, inverse)
+                arrays[name] = arrays_
+        return arrays
+
+    def __str__(self):
+        hops = [f'{step.ut}[{step.key}]' if step.key else str(step.ut) for step in self.steps]
+        return f'JoinPlan({" -> ".join(hops)}, features={len(self.names)})'
+
+    def __repr__(self):
+        return str(self)
@@ -16,16 +16,22 @@ from unitok.vocabulary import Vocab, VocabHub
 
 
 class Meta:
-    version = 'unidep-v4.1'
+    # v4.2: token data in columnar npy segments, and vocabularies in binary npy files
+    version = 'unidep-v4.2'
 
     def __init__(self):
-        self.note = ('Not compatible with unitok-v3 or lower version, '
-                     'please upgrade by `pip install unitok>4.0.0` to load the data.')
+        self.note = ('Not compatible with unitok-v4.4 or lower version, '
+                     'please upgrade by `pip install unitok>=4.5.0` to load the data.')
         self.website = 'https://unitok.github.io'
         self.modified_at = self.created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         self.vocabularies = VocabSet()
         self.tokenizers = TokenizerSet()
         self.features = FeatureSet()
+        # row segments of the data, the first segment holds the rows of the last full save,
+        # and the following ones hold the rows appended since then
+        self.segments = []
+        # row ranges saved by UniTok.save(shards=...), each with the segments holding its rows
+        self.shards = []
 
     @property
     def jobs(self):
@@ -48,10 +54,22 @@ class Meta:
                 classname in [UnknownTokenizer.get_classname(), UnionTokenizer.get_classname()]):
             warning(f"(unitok.meta) Tokenizer class {classname} not found in the class hub.")
             return UnknownTokenizer(tokenizer_id=tokenizer_id, classname=classname, vocab=vocab, **params)
-        return tokenizer_classes[classname](tokenizer_id=tokenizer_id, vocab=vocab, **params)
+        return tokenizer_classes[classname].restore(tokenizer_id=tokenizer_id, vocab=vocab, **params)
 
     @staticmethod
-    def parse_feature(name: str, column: str, tokenizer: str, truncate: int, order: int, key: bool, max_len: int):
+    def parse_feature(
+            name: str,
+            column: str,
+            tokenizer: str,
+            truncate: int,
+            order: int,
+            key: bool,
+            max_len: int,
+            dtype: str = None,
+    ):
+        """
+        :param dtype: Unused, as the storage dtype is derived from the vocabulary size, and each data file keeps its own dtype
+        """
         if not TokenizerHub.has(tokenizer):
             raise ValueError(f"(unitok.meta) Tokenizer {tokenizer} not found in the tokenizer hub.")
         tokenizer = TokenizerHub.get(tokenizer)
@@ -89,6 +107,14 @@ class Meta:
                          f'and then install the latest unitok version, '
                          f'following the use of `unidep-upgrade-v4` to upgrade the version.')
 
+    @staticmethod
+    def compare_version(a: str, b: str):
+        """
+        :return: positive if version a is newer than version b, negative if older, and 0 if equal
+        """
+        a, b = [tuple(int(part) for part in version.split('.')) for version in (a, b)]
+        return (a > b) - (a < b)
+
     @classmethod
     def filename(cls, save_dir):
         return os.path.join(save_dir, 'meta.json')
@@ -113,20 +139,29 @@ class Meta:
         current_version = cls.parse_version(cls.version)
         depot_version = cls.parse_version(meta_data.get('version'))
 
+        if cls.compare_version(depot_version, current_version) > 0:
+            raise ValueError(f'UniDep version ({depot_version}) is newer than the supported version ({current_version}), '
+                             f'please upgrade the unitok version by `pip install -U unitok` to load the data.')
         if current_version != depot_version:
             warning('Version mismatch, unexpected error may occur.')
 
         return meta_data
 
     @classmethod
-    def load(cls, save_dir):
+    def load(cls, save_dir, mmap: bool = False):
+        """
+        :param mmap: Memory-map the binary vocabularies
+        """
         kwargs = cls._compatible_readfile(save_dir)
 
         meta = cls()
         meta.created_at = kwargs.get('created_at')
-        meta.vocabularies = VocabSet({cls.parse_vocabulary(**v).load(save_dir) for v in kwargs.get('vocabularies')})
+        vocabularies = kwargs.get('vocabularies')
+        meta.vocabularies = VocabSet({cls.parse_vocabulary(**v).load(save_dir, mmap=mmap) for v in vocabularies})
         meta.tokenizers = TokenizerSet({cls.parse_tokenizer(**t) for t in kwargs.get('tokenizers')})
         meta.features = FeatureSet({cls.parse_feature(**f) for f in kwargs.get('features') or kwargs.get('jobs')})
+        meta.segments = kwargs.get('segments') or [dict(filename='data.pkl', size=None)]
+        meta.shards = kwargs.get('shards') or []
         meta.version = kwargs.get('version')
 
         return meta
@@ -141,8 +176,12 @@ class Meta:
             "vocabularies": [v.json() for v in self.vocabularies],
             "tokenizers": [t.json() for t in self.tokenizers],
             "features": [f.json() for f in self.features],
+            "segments": self.segments,
+            "shards": self.shards,
         }
 
     def save(self, save_dir):
+        # saved data is always written in the current format, even if loaded from an older version
+        self.version = Meta.version
         filename = self.filename(save_dir)
         JsonHandler.save(self.json(), filename)
@@ -0,0 +1,12 @@
+from unitok.observer.base_observer import BaseObserver
+from unitok.observer.timing_observer import TimingObserver
+from unitok.observer.memory_observer import MemoryObserver
+from unitok.observer.profile_observer import ProfileObserver
+
+
+__all__ = [
+    BaseObserver,
+    TimingObserver,
+    MemoryObserver,
+    ProfileObserver,
+]
@@ -0,0 +1,53 @@
+class BaseObserver:
+    """
+    Observer of the UniTok lifecycle, all callbacks do nothing by default
+    Callbacks receive the observed UniTok instance as the first argument
+    """
+
+    def on_tokenize_start(self, ut, action: str, features: list):
+        """
+        :param action: tokenize, tokenize_stream, or append
+        :param features: features to be tokenized
+        """
+
+    def on_tokenize_end(self, ut, action: str, report: dict):
+        """
+        :param report: json performance report of the run, None if the run fails
+        """
+
+    def on_feature_start(self, ut, features: list):
+        """
+        :param features: features tokenized together, i.e., sharing the same column and tokenizer
+        """
+
+    def on_feature_end(self, ut, features: list):
+        pass
+
+    def on_chunk(self, ut, features: list, rows: int):
+        """
+        :param rows: number of rows tokenized in the chunk
+        """
+
+    def on_save_start(self, ut, save_dir: str):
+        pass
+
+    def on_save_end(self, ut, save_dir: str):
+        pass
+
+    def on_load_start(self, ut, save_dir: str):
+        pass
+
+    def on_load_end(self, ut, save_dir: str):
+        pass
+
+    def on_union_start(self, ut, other, soft_union: bool):
+        pass
+
+    def on_union_end(self, ut, other, soft_union: bool):
+        pass
+
+    def on_filter_start(self, ut, feature):
+        pass
+
+    def on_filter_end(self, ut, feature):
+        pass
@@ -0,0 +1,83 @@
+import tracemalloc
+
+from unitok.observer.base_observer import BaseObserver
+from unitok.utils.handler import JsonHandler
+
+
+class MemoryObserver(BaseObserver):
+    """
+    Record the python memory allocated by each feature and phase with tracemalloc
+    Tracing slows down python allocations, use it for diagnosis rather than every run
+    Before python 3.9, the peak cannot be reset, so the peak of a phase is the peak since the tracing started
+    """
+
+    def __init__(self):
+        self.events = []
+        self._starts = dict()
+        self._peaks = dict()
+        self._started_tracing = False
+
+    def _collect(self):
+        # fold the peak since the last reset into every open phase, so nested phases keep the outer peaks correct
+        current, peak = tracemalloc.get_traced_memory()
+        for key in self._peaks:
+            self._peaks[key] = max(self._peaks[key], peak)
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        return current
+
+    def _start(self, phase, name=None):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        current = self._collect()
+        self._starts[(phase, name)] = current
+        self._peaks[(phase, name)] = current
+
+    def _end(self, phase, name=None):
+        if (phase, name) not in self._starts:
+            return
+        current = self._collect()
+        start = self._starts.pop((phase, name))
+        peak = self._peaks.pop((phase, name))
+        self.events.append(dict(phase=phase, name=name, allocated=current - start, peak=peak - start))
+
+        if not self._starts and self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def on_tokenize_start(self, ut, action, features):
+        self._start(action)
+
+    def on_tokenize_end(self, ut, action, report):
+        self._end(action)
+
+    def on_feature_start(self, ut, features):
+        self._start('feature', ','.join(f.name for f in features))
+
+    def on_feature_end(self, ut, features):
+        self._end('feature', ','.join(f.name for f in features))
+
+    def on_save_start(self, ut, save_dir):
+        self._start('save', save_dir)
+
+    def on_save_end(self, ut, save_dir):
+        self._end('save', save_dir)
+
+    def on_load_start(self, ut, save_dir):
+        self._start('load', save_dir)
+
+    def on_load_end(self, ut, save_dir):
+        self._end('load', save_dir)
+
+    def on_union_start(self, ut, other, soft_union):
+        self._start('union', str(other))
+
+    def on_union_end(self, ut, other, soft_union):
+        self._end('union', str(other))
+
+    def json(self):
+        return self.events
+
+    def save(self, filepath):
+        JsonHandler.save(self.json(), filepath)
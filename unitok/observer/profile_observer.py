@@ -0,0 +1,91 @@
+import cProfile
+import io
+import os
+import pstats
+
+from unitok.observer.base_observer import BaseObserver
+
+
+class ProfileObserver(BaseObserver):
+    """
+    Profile the tokenization of each feature with cProfile
+    Only the main process is profiled, i.e., work done by the process pool when workers > 1 is not attributed
+    """
+
+    def __init__(self, sample_every: int = 1):
+        """
+        :param sample_every: profile one of every `sample_every` chunks, to limit the profiling overhead on large data
+        """
+        if sample_every <= 0:
+            raise ValueError(f'sample_every should be positive, but {sample_every} is given')
+
+        self.sample_every = sample_every
+        self.profiles = dict()
+
+        self._profile = None
+        self._chunk = 0
+
+    def on_feature_start(self, ut, features):
+        self._profile = cProfile.Profile()
+        self._chunk = 0
+        self._profile.enable()
+
+    def on_chunk(self, ut, features, rows):
+        if self._profile is None:
+            return
+        self._chunk += 1
+        if self._chunk % self.sample_every:
+            self._profile.disable()
+        else:
+            self._profile.enable()
+
+    def on_feature_end(self, ut, features):
+        if self._profile is None:
+            return
+        self._profile.disable()
+        for feature in features:
+            # features tokenized together share the same profile
+            if feature.name in self.profiles:
+                self.profiles[feature.name].add(self._profile)
+            else:
+                self.profiles[feature.name] = pstats.Stats(self._profile)
+        self._profile = None
+
+    def get_stats(self, name: str):
+        return self.profiles[name]
+
+    def print_stats(self, name: str, sort_by='cumulative', limit=20):
+        stats = self.profiles[name]
+        stream, stats.stream = stats.stream, io.StringIO()
+        try:
+            stats.sort_stats(sort_by).print_stats(limit)
+            return stats.stream.getvalue()
+        finally:
+            stats.stream = stream
+
+    def json(self, sort_by='cumulative', limit=20):
+        """
+        :return: top functions of each feature, with call counts and times in seconds
+        """
+        data = dict()
+        for name, stats in self.profiles.items():
+            stats.sort_stats(sort_by)
+            functions = []
+            for func in stats.fcn_list[:limit]:
+                calls, primitive_calls, total_time, cumulative_time, _ = stats.stats[func]
+                functions.append(dict(
+                    function=pstats.func_std_string(func),
+                    calls=calls,
+                    total_time=total_time,
+                    cumulative_time=cumulative_time,
+                ))
+            data[name] = functions
+        return data
+
+    def save(self, save_dir):
+        """
+        Dump the profile of each feature to <save_dir>/<feature>.prof, which can be loaded by pstats or snakeviz
+        """
+        os.makedirs(save_dir, exist_ok=True)
+        for name, stats in self.profiles.items():
+            stats.dump_stats(os.path.join(save_dir, f'{name}.prof'))
@@ -0,0 +1,70 @@
+import time
+
+from unitok.observer.base_observer import BaseObserver
+from unitok.utils.handler import JsonHandler
+
+
+class TimingObserver(BaseObserver):
+    """
+    Record the wall time of each lifecycle phase as machine-readable events
+    """
+
+    def __init__(self):
+        self.events = []
+        self._starts = dict()
+        self._rows = 0
+
+    def _start(self, phase, name=None):
+        self._starts[(phase, name)] = time.perf_counter()
+
+    def _end(self, phase, name=None, **kwargs):
+        start = self._starts.pop((phase, name), None)
+        if start is None:
+            return
+        self.events.append(dict(phase=phase, name=name, duration=time.perf_counter() - start, **kwargs))
+
+    def on_tokenize_start(self, ut, action, features):
+        self._start(action)
+
+    def on_tokenize_end(self, ut, action, report):
+        self._end(action, rows=report['sample_size'] if report is not None else None)
+
+    def on_feature_start(self, ut, features):
+        self._start('feature', ','.join(f.name for f in features))
+        self._rows = 0
+
+    def on_chunk(self, ut, features, rows):
+        self._rows += rows
+
+    def on_feature_end(self, ut, features):
+        self._end('feature', ','.join(f.name for f in features), rows=self._rows)
+
+    def on_save_start(self, ut, save_dir):
+        self._start('save', save_dir)
+
+    def on_save_end(self, ut, save_dir):
+        self._end('save', save_dir)
+
+    def on_load_start(self, ut, save_dir):
+        self._start('load', save_dir)
+
+    def on_load_end(self, ut, save_dir):
+        self._end('load', save_dir)
+
+    def on_union_start(self, ut, other, soft_union):
+        self._start('union', str(other))
+
+    def on_union_end(self, ut, other, soft_union):
+        self._end('union', str(other), soft_union=soft_union)
+
+    def on_filter_start(self, ut, feature):
+        self._start('filter')
+
+    def on_filter_end(self, ut, feature):
+        self._end('filter', size=len(ut))
+
+    def json(self):
+        return self.events
+
+    def save(self, filepath):
+        JsonHandler.save(self.json(), filepath)
@@ -0,0 +1,111 @@
+import os
+import time
+from datetime import datetime
+
+from unitok.utils.handler import JsonHandler
+
+
+class Report:
+    """
+    Performance report of a tokenization run, e.g., tokenize, tokenize_stream or append
+    Memory is not reported, use MemoryObserver for the memory allocated by each feature
+    """
+
+    def __init__(self, action: str, workers: int = None):
+        self.action = action
+        self.workers = workers
+        self.created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.sample_size = 0
+        self.wall_time = 0.0
+        self.features = dict()
+
+        self._start = time.perf_counter()
+
+    def record(
+            self,
+            feature,
+            group: list,
+            rows: int,
+            tokens: int,
+            wall_time: float,
+            tokenizer_time: float,
+            vocab_time: float,
+            vocab_size: int,
+            vocab_growth: int,
+    ):
+        """
+        Accumulate the statistics of a feature, which might be recorded once for each chunk
+        :param group: Names of the features that are tokenized together with this feature
+        :param tokenizer_time: Time spent by the tokenizer, summed over worker processes
+        :param vocab_time: Time spent on appending tokens to the vocabulary, summed over worker processes
+        """
+        if feature.name not in self.features:
+            self.features[feature.name] = dict(
+                column=str(feature.column),
+                tokenizer=feature.tokenizer.get_tokenizer_id(),
+                group=group,
+                rows=0,
+                tokens=0,
+                wall_time=0.0,
+                tokenizer_time=0.0,
+                vocab_time=0.0,
+                vocab_size=0,
+                vocab_growth=0,
+            )
+
+        stats = self.features[feature.name]
+        stats['rows'] += rows
+        stats['tokens'] += tokens
+        stats['wall_time'] += wall_time
+        stats['tokenizer_time'] += tokenizer_time
+        stats['vocab_time'] += vocab_time
+        stats['vocab_size'] = vocab_size
+        stats['vocab_growth'] += vocab_growth
+
+    def finish(self, sample_size: int):
+        self.sample_size = sample_size
+        self.wall_time = time.perf_counter() - self._start
+        return self
+
+    def json(self):
+        features = dict()
+        for name, stats in self.features.items():
+            wall_time = stats['wall_time']
+            features[name] = dict(
+                **stats,
+                rows_per_sec=stats['rows'] / wall_time if wall_time else None,
+                tokens_per_sec=stats['tokens'] / wall_time if wall_time else None,
+            )
+
+        return {
+            'action': self.action,
+            'created_at': self.created_at,
+            'workers': self.workers,
+            'sample_size': self.sample_size,
+            'wall_time': self.wall_time,
+            'features': features,
+        }
+
+    def __str__(self):
+        return f'Report({self.action}, features={len(self.features)}, wall_time={self.wall_time:.2f}s)'
+
+    def __repr__(self):
+        return str(self)
+
+    @staticmethod
+    def filename(save_dir):
+        return os.path.join(save_dir, 'report.json')
+
+    @classmethod
+    def load(cls, save_dir):
+        """
+        :return: json reports of the previous runs, or an empty list if not reported
+        """
+        filename = cls.filename(save_dir)
+        if not os.path.exists(filename):
+            return []
+        return JsonHandler.load(filename)
+
+    @classmethod
+    def save(cls, reports: list, save_dir):
+        JsonHandler.save(reports, cls.filename(save_dir))
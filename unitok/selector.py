@@ -1,3 +1,5 @@
+from typing import Iterable
+
 from unitok import Vocab
 from unitok.tokenizer.base_tokenizer import BaseTokenizer
 
@@ -9,21 +11,33 @@ class Selector:
     def __init__(self, meta: Meta, *selectors):
         self.meta = meta
         self.selectors = selectors
+        # feature names compiled from the last candidates, which are the same for samples of a table
+        self._compiled = (None, None)
 
-    def _auto_select(self, sample, selector):
+    def _auto_select(self, candidates, selector):
         if isinstance(selector, str):
-            return {selector}
+            return [selector]
         if isinstance(selector, Feature):
-            return {selector.name}
+            return [selector.name]
         if isinstance(selector, BaseTokenizer):
-            return {name for name in sample if self.meta.features[name].tokenizer is selector}
+            return [name for name in candidates if self.meta.features[name].tokenizer is selector]
         if isinstance(selector, Vocab):
-            return {name for name in sample if self.meta.features[name].tokenizer.vocab.equals(selector)}
+            return [name for name in candidates if self.meta.features[name].tokenizer.vocab.equals(selector)]
         raise ValueError(f'Unrecognized selector: {selector}')
 
+    def compile(self, candidates: Iterable[str]) -> list:
+        """
+        Resolve the selectors into a fixed list of feature names, so that only the selected features are fetched
+        :param candidates: Names of the features that can be selected, e.g., loaded features of a table
+        """
+        candidates = tuple(candidates)
+        compiled_candidates, names = self._compiled
+        if candidates != compiled_candidates:
+            names = []
+            for selector in self.selectors:
+                names.extend(name for name in self._auto_select(candidates, selector) if name not in names)
+            self._compiled = (candidates, names)
+        return names
+
     def __call__(self, sample: dict):
-        name_set = set()
-        for s in self.selectors:
-            ns = self._auto_select(sample, s)
-            name_set.update(ns)
-        return {name: sample[name] for name in name_set}
+        return {name: sample[name] for name in self.compile(sample)}
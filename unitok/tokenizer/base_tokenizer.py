@@ -1,7 +1,8 @@
 import abc
+import time
 from typing import Union
 
-from unitok.utils import Instance, function
+from unitok.utils import Instance, Cache, function
 from unitok.utils.hub import Hub
 from unitok.vocabulary import Vocab, VocabHub
 
@@ -16,8 +17,14 @@ class BaseTokenizer(abc.ABC):
             self,
             vocab: Union[str, Vocab],
             tokenizer_id: str = None,
+            cache_size: int = None,
             **kwargs
     ):
+        """
+        :param vocab: Vocabulary or its name
+        :param tokenizer_id: Tokenizer id, a random id is generated if not given
+        :param cache_size: Number of tokenized results memorized by input value, cache is disabled if not given
+        """
         if isinstance(vocab, str):
             if VocabHub.has(vocab):
                 self.vocab = VocabHub.get(vocab)
@@ -27,10 +34,22 @@ class BaseTokenizer(abc.ABC):
             self.vocab = vocab
 
         self._tokenizer_id = tokenizer_id
+        # cached token ids are only valid for the edition of the vocabulary, i.e., until it is trimmed or shrunk
+        self.cache = Cache(cache_size) if cache_size else None
+        self._cache_edition = self.vocab.edition
+        # time spent on appending tokens to the vocabulary, for tokenization reports
+        self.vocab_time = 0.0
 
         TokenizerHub.add(self)
         VocabHub.add(self.vocab)
 
+    @classmethod
+    def restore(cls, **kwargs):
+        """
+        Restore a saved tokenizer from its json, subclasses can defer expensive construction until the first call
+        """
+        return cls(**kwargs)
+
     def get_tokenizer_id(self):
         if self._tokenizer_id is None:
             self._tokenizer_id = self.prefix + function.get_random_string(length=6)
@@ -52,15 +71,104 @@ class BaseTokenizer(abc.ABC):
         if not return_list:
             tokens = [tokens]
 
+        start = time.perf_counter()
         ids = [self.vocab.append(token) for token in tokens]
+        self.vocab_time += time.perf_counter() - start
 
         if not return_list:
             ids = ids[0]
         return ids
 
+    def _batch_convert_tokens_to_ids(self, batch: list):
+        for tokens in batch:
+            if isinstance(tokens, list) != self.return_list:
+                raise ValueError(f'(tokenizer.{self.get_classname()}) Unexpected input, requiring return_list={self.return_list}')
+
+        start = time.perf_counter()
+        append = self.vocab.append
+        if self.return_list:
+            ids = [[append(token) for token in tokens] for tokens in batch]
+        else:
+            ids = [append(token) for token in batch]
+        self.vocab_time += time.perf_counter() - start
+        return ids
+
     def __call__(self, objs):
         return self._convert_tokens_to_ids(objs)
 
+    def batch_call(self, objs: list, truncate: int = None) -> list:
+        """
+        Tokenize a batch of objects, e.g., a chunk of a dataframe column
+        Subclasses can override this method to amortize the per-object overhead
+        :param objs: list of objects to tokenize
+        :param truncate: truncation of the feature, list tokenizers may skip tokens that will be truncated
+        :return: list of tokenized results, one for each object
+        """
+        return [self(obj) for obj in objs]
+
+    def _replay_counter(self, ids):
+        """
+        Count the ids of a cached result, as if the object was tokenized again
+        Tokenizers that do not count their output should override this method
+        """
+        self.vocab.counter(ids)
+
+    def _copy(self, ids):
+        return list(ids) if self.return_list else ids
+
+    def cached_batch_call(self, objs: list, truncate: int = None) -> list:
+        """
+        Batch call through the memoization cache, objects are tokenized at their first appearance,
+        so that the vocabulary is appended in the same order as without cache
+        """
+        if self.cache is None:
+            return self.batch_call(objs, truncate=truncate)
+        if self._cache_edition != self.vocab.edition:
+            self.cache.clear(keep_stats=True)
+            self._cache_edition = self.vocab.edition
+
+        missing, repeated = object(), object()
+        results = [missing] * len(objs)
+        firsts = dict()  # cache key -> position of its first appearance
+        duplicates = []  # (cache key, position) of repeated appearances
+        for i, obj in enumerate(objs):
+            key = (obj.__class__, obj, truncate)
+            try:
+                if key in firsts:
+                    results[i] = repeated
+                    duplicates.append((key, i))
+                    continue
+            except TypeError:  # unhashable objects are not cached
+                continue
+
+            ids = self.cache.get(key, missing)
+            if ids is missing:
+                firsts[key] = i
+            else:
+                self._replay_counter(ids)
+                results[i] = self._copy(ids)
+
+        positions = [i for i, ids in enumerate(results) if ids is missing]
+        for i, ids in zip(positions, self.batch_call([objs[i] for i in positions], truncate=truncate)):
+            results[i] = ids
+
+        for key, i in firsts.items():
+            self.cache.set(key, self._copy(results[i]))
+        for key, i in duplicates:
+            ids = self.cache.get(key, missing)
+            if ids is missing:  # evicted by a later object in the batch
+                ids = results[firsts[key]]
+            self._replay_counter(ids)
+            results[i] = self._copy(ids)
+        return results
+
+    def cache_info(self):
+        """
+        Hits and misses of worker processes are merged when workers > 1, while their cached values stay in the workers
+        :return: cache statistics, or None if cache is disabled
+        """
+        return None if self.cache is None else self.cache.stats()
+
     def __str__(self):
         return f'{self._detailed_classname}({self.get_tokenizer_id()}, vocab={self.vocab.name})'
 
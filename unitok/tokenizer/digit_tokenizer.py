@@ -1,4 +1,7 @@
+import time
+
 from unitok.tokenizer import BaseTokenizer
+from unitok.utils import function
 
 
 class DigitTokenizer(BaseTokenizer):
@@ -22,6 +25,19 @@ class DigitTokenizer(BaseTokenizer):
             self.vocab.extend([str(i) for i in range(len(self.vocab), obj + 1)])
         return obj
 
+    def _replay_counter(self, ids):
+        # digits are counted only when the vocabulary is extended
+        pass
+
+    def batch_call(self, objs, truncate=None):
+        objs = [int(obj) for obj in objs]
+        if objs:
+            # extending to the largest value covers every other value in the batch
+            start = time.perf_counter()
+            self(max(objs))
+            self.vocab_time += time.perf_counter() - start
+        return objs
+
 
 class DigitsTokenizer(DigitTokenizer):
     return_list = True
@@ -32,3 +48,13 @@ class DigitsTokenizer(DigitTokenizer):
         for o in obj:
             super().__call__(o)
         return obj
+
+    def batch_call(self, objs, truncate=None):
+        slicer = function.get_slice(truncate)
+        objs = [[int(o) for o in obj[slicer]] for obj in objs]
+        max_obj = max((max(obj) for obj in objs if obj), default=None)
+        if max_obj is not None:
+            start = time.perf_counter()
+            super().__call__(max_obj)
+            self.vocab_time += time.perf_counter() - start
+        return objs
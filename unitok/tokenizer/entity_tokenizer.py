@@ -1,4 +1,5 @@
 from unitok.tokenizer import BaseTokenizer
+from unitok.utils import function
 
 
 class EntityTokenizer(BaseTokenizer):
@@ -6,8 +7,18 @@ class EntityTokenizer(BaseTokenizer):
     name = 'entity'
     param_list = []
 
+    def batch_call(self, objs, truncate=None):
+        return self._batch_convert_tokens_to_ids(objs)
+
 
 class EntitiesTokenizer(BaseTokenizer):
     return_list = True
     name = 'entities'
     param_list = []
+
+    def batch_call(self, objs, truncate=None):
+        if truncate:
+            # truncated entities are not appended to the vocabulary
+            slicer = function.get_slice(truncate)
+            objs = [obj[slicer] for obj in objs]
+        return self._batch_convert_tokens_to_ids(objs)
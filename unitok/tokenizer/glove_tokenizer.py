@@ -1,3 +1,5 @@
+from itertools import islice
+
 import nltk
 
 from unitok.vocabulary import VocabHub
@@ -19,3 +21,25 @@ class GloVeTokenizer(BaseTokenizer):
     def __call__(self, obj):
         objs = nltk.tokenize.word_tokenize(obj.lower(), language=self.language)
         return [self.vocab[o] for o in objs if o in self.vocab]
+
+    def _replay_counter(self, ids):
+        # glove tokenizer does not count tokens
+        pass
+
+    def batch_call(self, objs, truncate=None):
+        o2i = self.vocab.o2i
+        word_tokenize = nltk.tokenize.word_tokenize
+
+        def lookup(words):
+            return (o2i[o] for o in words if o in o2i)
+
+        batch = []
+        for obj in objs:
+            words = word_tokenize(obj.lower(), language=self.language)
+            if not truncate:
+                batch.append(list(lookup(words)))
+            elif truncate > 0:
+                batch.append(list(islice(lookup(words), truncate)))
+            else:
+                batch.append(list(islice(lookup(reversed(words)), -truncate))[::-1])
+        return batch
@@ -12,3 +12,16 @@ class SplitTokenizer(EntitiesTokenizer):
     def __call__(self, obj):
         tokens = obj.split(self.sep)
         return super().__call__(tokens)
+
+    def _split(self, obj: str, truncate: int = None):
+        """
+        Split the string, and stop splitting at the truncation
+        """
+        if not truncate:
+            return obj.split(self.sep)
+        if truncate > 0:
+            return obj.split(self.sep, truncate)[:truncate]
+        return obj.rsplit(self.sep, -truncate)[truncate:]
+
+    def batch_call(self, objs, truncate=None):
+        return self._batch_convert_tokens_to_ids([self._split(obj, truncate) for obj in objs])
@@ -1,3 +1,5 @@
+import threading
+import time
 from typing import Union
 
 from pigmento import pnt
@@ -10,16 +12,66 @@ from unitok.tokenizer import BaseTokenizer
 class TransformersTokenizer(BaseTokenizer):
     return_list = True
 
-    def __init__(self, vocab: Union[str, Vocab], tokenizer_id: str = None, key: str = None, **kwargs):
-        super().__init__(vocab=vocab, tokenizer_id=tokenizer_id)
+    # set by restore, so that constructors of subclasses are run without loading the pretrained tokenizer
+    _restoring = threading.local()
+
+    def __init__(
+            self,
+            vocab: Union[str, Vocab],
+            tokenizer_id: str = None,
+            key: str = None,
+            cache_size: int = None,
+            **kwargs
+    ):
+        self._setup(vocab=vocab, tokenizer_id=tokenizer_id, key=key, cache_size=cache_size, **kwargs)
+        if not getattr(self._restoring, 'active', False):
+            self.materialize()
+
+    def _setup(self, vocab, tokenizer_id, key, cache_size, **kwargs):
+        self.kwargs = kwargs
+        super().__init__(vocab=vocab, tokenizer_id=tokenizer_id, cache_size=cache_size)
         self.key = key
 
-        self.kwargs = kwargs
         self.param_list = ['key']
         self.param_list.extend(list(kwargs.keys()))
 
-        self.tokenizer = AutoTokenizer.from_pretrained(self.key, **self.kwargs)
-        self.vocab.extend(self._generate_token_list())
+        self._tokenizer = None
+        self._materialized = False
+
+    @classmethod
+    def restore(cls, **kwargs):
+        """
+        Restore the tokenizer by the constructor of its class, without loading the pretrained tokenizer,
+        which is loaded on the first call
+        """
+        cls._restoring.active = True
+        try:
+            return cls(**kwargs)
+        finally:
+            cls._restoring.active = False
+
+    @property
+    def tokenizer(self):
+        if self._tokenizer is None:
+            self._tokenizer = AutoTokenizer.from_pretrained(self.key, **self.kwargs)
+        return self._tokenizer
+
+    def materialize(self):
+        """
+        Load the pretrained tokenizer and fill its tokens into the vocabulary, which is done only once
+        """
+        if not self._materialized:
+            # tokens of the pretrained tokenizer are not counted, e.g., when a restored vocabulary already holds them
+            counter = self.vocab.counter
+            is_active = counter.is_active
+            counter.deactivate()
+            try:
+                self.vocab.extend(self._generate_token_list())
+            finally:
+                if is_active:
+                    counter.activate()
+            self._materialized = True
+        return self
 
     def _generate_token_list(self):
         if not hasattr(self.tokenizer, 'vocab'):
@@ -47,23 +99,68 @@ class TransformersTokenizer(BaseTokenizer):
         return token_list
 
     def __getattr__(self, item):
-        return self.kwargs[item]
+        kwargs = self.__dict__.get('kwargs', {})
+        if item not in kwargs:
+            raise AttributeError(item)
+        return kwargs[item]
 
     def __call__(self, obj):
+        self.materialize()
         tokens = self.tokenizer.tokenize(obj)
         tokens = self.tokenizer.convert_tokens_to_ids(tokens)
         for token in tokens:
             self.vocab.counter(token)
         return tokens
 
+    @staticmethod
+    def _get_prefix(obj: str, truncate: int):
+        """
+        Cut the text after `truncate` space-separated words, as each non-empty word is encoded into at least one token
+        """
+        words = obj.split(' ', truncate)
+        if len(words) <= truncate:
+            return obj
+        return obj[:len(obj) - len(words[-1]) - 1].rstrip(' ')
+
+    def _batch_encode(self, objs, truncate=None):
+        kwargs = dict(add_special_tokens=False, return_attention_mask=False, return_token_type_ids=False, verbose=False)
+        if truncate is not None and truncate > 0:
+            kwargs.update(truncation=True, max_length=truncate)
+        return self.tokenizer(objs, **kwargs)['input_ids']
+
+    def batch_call(self, objs, truncate=None):
+        self.materialize()
+        if not objs or not getattr(self.tokenizer, 'is_fast', False):
+            return super().batch_call(objs, truncate=truncate)
+
+        if truncate is not None and truncate > 0 and self.tokenizer.backend_tokenizer.pre_tokenizer is not None:
+            # pre-tokenizers split the text at spaces, so the tokens of a word prefix are a prefix of the tokens
+            # of the whole text, and long texts are not encoded beyond the truncation
+            prefixes = [self._get_prefix(obj, truncate) for obj in objs]
+            batch = self._batch_encode(prefixes, truncate=truncate)
+
+            # prefixes with empty words might be encoded into fewer tokens, re-encode the whole texts instead
+            retry = [i for i, ids in enumerate(batch) if len(ids) < truncate and prefixes[i] is not objs[i]]
+            if retry:
+                for i, ids in zip(retry, self._batch_encode([objs[i] for i in retry], truncate=truncate)):
+                    batch[i] = ids
+        else:
+            batch = self._batch_encode(objs, truncate=truncate)
+
+        start = time.perf_counter()
+        for tokens in batch:
+            self.vocab.counter(tokens)
+        self.vocab_time += time.perf_counter() - start
+        return batch
+
     def __getstate__(self):
+        # the pretrained tokenizer is reloaded on demand after unpickling, e.g., in worker processes
         state = self.__dict__.copy()
-        state['tokenizer'] = None
+        state['_tokenizer'] = None
         return state
 
     def __setstate__(self, state):
         self.__dict__.update(state)
-        self.tokenizer = AutoTokenizer.from_pretrained(self.key, **self.kwargs)
 
 
 class BertTokenizer(TransformersTokenizer):
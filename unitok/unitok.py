@@ -1,22 +1,37 @@
 import os
+import time
 import warnings
-from typing import Union, Optional, cast, Callable
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext, contextmanager
+from typing import Union, Optional, cast, Callable, Iterable
 
+import numpy as np
 import pandas as pd
 from rich.console import Console
 from rich.table import Table
 from rich.text import Text
 from tqdm import tqdm
 
+from unitok.batch_iterator import BatchIterator
 from unitok.feature import Feature
+from unitok.join_plan import JoinPlan
 from unitok.selector import Selector
 from unitok.utils.verbose import info, warning
 from unitok.meta import Meta
+from unitok.observer import BaseObserver
+from unitok.report import Report
 from unitok.status import Status
 from unitok.tokenizer import BaseTokenizer, TokenizerHub, DigitTokenizer
 from unitok.tokenizer.unknown_tokenizer import UnknownTokenizer
-from unitok.utils import Symbols, Symbol, PickleHandler
+from unitok.utils import Symbols, Symbol, PickleHandler, Cache, function
+from unitok.utils.codec import Codecs
+from unitok.utils.column import Column, AtomColumn, ListColumn, BlockPart, LazyData
+from unitok.utils.handler import NumpyHandler, TableHandler
 from unitok.utils.hub import ParamHub
+from unitok.utils.prefetcher import Prefetcher
+from unitok.utils.reader import Readers
+from unitok.vocabulary import Vocab
 
 
 class UniTok(Status):
@@ -33,11 +48,39 @@ class UniTok(Status):
         # sample size is the number of rows in the table, while len(self) is the number of legal indices
         self._legal_indices = []
         self._legal_flags = []
+        # legal indices as an array for batch access, rebuilt when its length changes,
+        # as legal indices are only filtered in order or extended by appended rows
+        self._legal_array = None
         self._indices_is_init = False
         self._sample_size = None
+        # number of leading rows that are saved in save_dir and not modified since then
+        self._persisted_size = 0
+        # features whose saved files are outdated, e.g., newly tokenized, replicated or retruncated features
+        self._dirty_features = set()
+        # vocabularies saved in save_dir by name, whose files are deleted once they are removed from the table
+        self._saved_vocabs = dict()
+        # loaded with a subset of features or rows, e.g., UniTok.load(features=..., rows=...), which is not savable
+        self._is_partial = False
+        # position of the first loaded row in the saved table, key ids of the rows are shifted by it
+        self._row_offset = 0
 
         self._union_type = None
         self._soft_unions = dict()
+        # tables that soft-union this table, whose packed rows are outdated once this table is modified
+        self._union_parents = weakref.WeakSet()
+        # selectors of ut[index, selector], which are compiled once into feature names
+        self._selectors = dict()
+        # names of the loaded features including those of soft-unioned tables, the candidates of the selectors
+        self._loaded_names = None
+        # soft-union join plans of get_batch, by selected feature names
+        self._join_plans = dict()
+        # packed rows by (row, selected feature names), see start_caching
+        self.row_cache: Optional[Cache] = None
+
+        # json reports of tokenization runs, persisted as report.json
+        self.reports = []
+
+        self.observers = []
 
     @property
     def key_job(self):
@@ -64,6 +107,46 @@ class UniTok(Status):
         elif self._union_type != union_type:
             raise ValueError(f'Union type is already set: {self._union_type}')
 
+    def add_observer(self, observer: BaseObserver):
+        """
+        Observe the lifecycle of the UniTok table, e.g., tokenization, saving, loading, union and filtering
+        """
+        if not isinstance(observer, BaseObserver):
+            raise ValueError(f'observer should be an instance of BaseObserver, but {type(observer)} is given')
+        self.observers.append(observer)
+        return self
+
+    def remove_observer(self, observer: BaseObserver):
+        self.observers.remove(observer)
+        return self
+
+    def _notify(self, event: str, *args):
+        for observer in self.observers:
+            getattr(observer, event)(self, *args)
+
+    @contextmanager
+    def _observe(self, phase: str, *args):
+        """
+        Notify the observers of a phase, e.g., save, load, union or filter, whose end is notified even if it fails
+        """
+        self._notify(f'on_{phase}_start', *args)
+        try:
+            yield
+        finally:
+            self._notify(f'on_{phase}_end', *args)
+
+    @contextmanager
+    def _observe_tokenize(self, action: str, features: list):
+        """
+        Notify the observers of a tokenization run, which ends with a None report if the run fails
+        """
+        self._notify('on_tokenize_start', action, features)
+        try:
+            yield
+        except BaseException:
+            self._notify('on_tokenize_end', action, None)
+            raise
+
     @Status.require_not_initialized
     def init_indices(self):
         self._indices_is_init = True
@@ -72,41 +155,418 @@ class UniTok(Status):
         self._legal_flags = [True] * self._sample_size
 
     @classmethod
-    def load(cls, save_dir: str, tokenizer_lib: str = None):
-        with cls() as ut:
-            ParamHub.add(Symbols.tokenizer, tokenizer_lib)
-            ut.save_dir = save_dir
-            ut.meta = Meta.load(save_dir)
-            ut.data = PickleHandler.load(ut.filepath)
-
-        for feature in ut.meta.features:
-            if feature.key:
-                if ut.key_feature is not None:
-                    raise ValueError(f'multiple key features found: '
-                                     f'{cast(Feature, ut.key_feature).name} and {feature.name}')
-                ut.key_feature = feature
-
-        if ut.key_feature is None:
-            raise ValueError('key feature not found')
-
-        ut.status = Symbols.tokenized
-        ut.init_indices()
-
+    def load(
+            cls,
+            save_dir: str,
+            tokenizer_lib: str = None,
+            mmap: bool = False,
+            features: Iterable[str] = None,
+            rows: slice = None,
+            lazy: bool = False,
+            observers: Iterable[BaseObserver] = None,
+            shard: int = None,
+            num_shards: int = None,
+    ):
+        """
+        :param mmap: Memory-map the token arrays and vocabularies instead of reading them into memory,
+            so that the loading is instant and the pages are shared across processes
+        :param features: Names of the features to load, the key feature is always loaded,
+            and the meta still describes all features
+        :param rows: Range of rows to load, e.g., slice(0, 10000)
+        :param lazy: Read the data of a feature when it is accessed for the first time, e.g., by pack or __getitem__
+        :param observers: Observers of the loaded UniTok, which also observe the loading
+        :param shard: Load only the rows of the shard-th of num_shards shards, e.g., the rank in distributed training,
+            which are the saved shards if saved by UniTok.save(shards=num_shards), otherwise even row ranges
+        :param num_shards: Number of shards, e.g., the world size in distributed training
+        """
+        if (shard is None) != (num_shards is None):
+            raise ValueError('shard and num_shards should be given together')
+        if shard is not None:
+            if rows is not None:
+                raise ValueError('rows and shard cannot be given together')
+            if not 0 <= shard < num_shards:
+                raise ValueError(f'shard should be in [0, {num_shards}), but {shard} is given')
+
+        ut = cls()
+        for observer in observers or []:
+            ut.add_observer(observer)
+
+        with ut._observe('load', save_dir):
+            with ut:
+                ParamHub.add(Symbols.tokenizer, tokenizer_lib)
+                ut.save_dir = save_dir
+                ut.meta = Meta.load(save_dir, mmap=mmap)
+                ut.reports = Report.load(save_dir)
+
+            for feature in ut.meta.features:
+                if feature.key:
+                    if ut.key_feature is not None:
+                        raise ValueError(f'multiple key features found: '
+                                         f'{cast(Feature, ut.key_feature).name} and {feature.name}')
+                    ut.key_feature = feature
+
+            if ut.key_feature is None:
+                raise ValueError('key feature not found')
+
+            shard = None if num_shards is None else (shard, num_shards)
+            ut.data = ut._load_data(features=features, rows=rows, mmap=mmap, lazy=lazy, shard=shard)
+
+            ut.status = Symbols.tokenized
+            ut.init_indices()
+            ut._persisted_size = ut._sample_size
+            ut._saved_vocabs = {vocab.name: vocab for vocab in ut.meta.vocabularies}
         return ut
 
+    def _get_column_class(self, name: str):
+        return ListColumn if self.meta.features[name].return_list else AtomColumn
+
+    def _load_pickle(self, segment: dict, pickles: dict):
+        """
+        :param pickles: Loaded legacy pickle segments, which are read only once
+        """
+        if segment['filename'] not in pickles:
+            pickles[segment['filename']] = PickleHandler.load(os.path.join(self.save_dir, segment['filename']))
+        return pickles[segment['filename']]
+
+    def _load_arrays(self, segment: dict, name: str, mmap: bool, start: int, end: int):
+        """
+        :return: array part of the feature in rows [start, end) of a columnar segment
+        """
+        files = segment['files'][name]
+        # rows outside the range are never read, as the arrays are memory-mapped before slicing
+        sliced = start > 0 or end < segment['size']
+        if 'blocks' in files:
+            return self._load_blocks(segment, name, mmap).window(start, end)
+
+        part = NumpyHandler.load(os.path.join(self.save_dir, files['values']), mmap=mmap or sliced)
+        if 'offsets' in files:
+            part = part, NumpyHandler.load(os.path.join(self.save_dir, files['offsets']), mmap=mmap or sliced)
+
+        if not sliced:
+            return part
+        part = self._get_column_class(name).slice_part(part, start, end)
+        if mmap:
+            return part
+        return tuple(map(np.array, part)) if isinstance(part, tuple) else np.array(part)
+
+    def _load_blocks(self, segment: dict, name: str, mmap: bool):
+        files = segment['files'][name]
+        return BlockPart(
+            column_class=self._get_column_class(name),
+            blocks=NumpyHandler.load(os.path.join(self.save_dir, files['blocks']), mmap=mmap),
+            index=NumpyHandler.load(os.path.join(self.save_dir, files['index'])),
+            codec=Codecs.get(files['codec']),
+            block_size=files['block_size'],
+            size=segment['size'],
+            dtype=np.dtype(files['dtype']),
+        )
+
+    def _load_feature(self, name: str, ranges: list, mmap: bool, pickles: dict):
+        """
+        :param ranges: Row ranges to load in each segment, as tuples of (segment, start, end)
+        """
+        column_class = self._get_column_class(name)
+        data = []
+        for segment, start, end in ranges:
+            if segment.get('format', 'pkl') == 'pkl':
+                lines = self._load_pickle(segment, pickles)[name]
+                data.extend(lines[start:end] if start > 0 or end < len(lines) else lines)
+                continue
+
+            part = self._load_arrays(segment, name, mmap, start, end)
+            if isinstance(data, Column) and not data.tail:
+                data.add_part(part)
+            else:
+                # rows of legacy pickle segments are converted to arrays before the columnar segment
+                data = column_class([column_class.export_lines(data), part] if len(data) else [part])
+        return data
+
+    def _get_shard_rows(self, shard: int, num_shards: int, size: int):
+        """
+        :return: row range of the shard, following the saved shards if their number matches
+        """
+        if len(self.meta.shards) == num_shards:
+            return slice(self.meta.shards[shard]['start'], self.meta.shards[shard]['end'])
+        return slice(shard * size // num_shards, (shard + 1) * size // num_shards)
+
+    def _load_data(
+            self,
+            features: Optional[Iterable[str]],
+            rows: Optional[slice],
+            mmap: bool,
+            lazy: bool,
+            shard: Optional[tuple] = None,
+    ):
+        """
+        :param shard: Tuple of (shard, num_shards), whose row range replaces rows
+        """
+        pickles = dict()
+        segments = self.meta.segments
+        sizes = [segment['size'] if segment.get('size') is not None
+                 else len(self._load_pickle(segment, pickles)[self.key_feature.name]) for segment in segments]
+
+        first = segments[0]
+        names = list(first['files']) if first.get('format', 'pkl') != 'pkl' else list(self._load_pickle(first, pickles))
+        if features is not None:
+            features = set(features)
+            for name in features:
+                if not self.meta.features.has(name):
+                    raise ValueError(f'feature {name} not found')
+            features.add(self.key_feature.name)
+            self._is_partial = self._is_partial or bool(set(names) - features)
+            names = [name for name in names if name in features]
+
+        start, end = 0, sum(sizes)
+        if shard is not None:
+            rows = self._get_shard_rows(*shard, end)
+        if rows is not None:
+            start, end, step = rows.indices(end)
+            if step != 1:
+                raise ValueError(f'rows should be a continuous slice, but step {step} is given')
+            end = max(start, end)
+            self._is_partial = self._is_partial or end - start < sum(sizes)
+            self._row_offset = start
+
+        ranges = []
+        lower = 0
+        for segment, size in zip(segments, sizes):
+            if lower < end and lower + size > start:
+                ranges.append((segment, max(start - lower, 0), min(end - lower, size)))
+            lower += size
+
+        def loader(name):
+            return self._load_feature(name, ranges, mmap, pickles)
+
+        if lazy:
+            return LazyData(loader, names)
+        return {name: loader(name) for name in names}
+
+    def _save_segment(self, start: int, end: int, filename: str, codec: Optional[str], block_size: int):
+        """
+        Save rows in [start, end) as a columnar segment, with one flat array for each atomic feature,
+        and a values array plus an offsets array for each list feature
+        """
+        files = {name: self._save_feature(name, start, end, filename, codec, block_size) for name in self.data}
+        self.meta.segments.append(dict(filename=filename, size=end - start, format='npy', files=files))
+
+    def _save_feature(self, name: str, start: int, end: int, filename: str, codec: Optional[str], block_size: int):
+        """
+        Save rows in [start, end) of a feature into its own files of the segment
+        :param codec: Compress the arrays in blocks of block_size rows, None for uncompressed arrays
+        :return: filenames of the feature, which are referenced in the segment of meta.json
+        """
+        column_class = self._get_column_class(name)
+        arrays = column_class.export_lines(self.data[name], start, end)
+        # token ids are stored in the narrowest dtype of the current vocabulary, so each file has its own dtype
+        arrays = column_class.astype(arrays, self.meta.features[name].dtype)
+
+        if codec is not None:
+            blocks, index = BlockPart.encode(column_class, arrays, Codecs.get(codec), block_size)
+            files = dict(blocks=f'{filename}.{name}.blocks.npy', index=f'{filename}.{name}.index.npy')
+            NumpyHandler.save(blocks, os.path.join(self.save_dir, files['blocks']))
+            NumpyHandler.save(index, os.path.join(self.save_dir, files['index']))
+            values = arrays[0] if isinstance(arrays, tuple) else arrays
+            return dict(**files, codec=Codecs.get(codec).name, block_size=block_size, dtype=str(values.dtype))
+
+        if not isinstance(arrays, tuple):
+            files = dict(values=f'{filename}.{name}.npy')
+            NumpyHandler.save(arrays, os.path.join(self.save_dir, files['values']))
+            return files
+
+        files = dict(values=f'{filename}.{name}.values.npy', offsets=f'{filename}.{name}.offsets.npy')
+        NumpyHandler.save(arrays[0], os.path.join(self.save_dir, files['values']))
+        NumpyHandler.save(arrays[1], os.path.join(self.save_dir, files['offsets']))
+        return files
+
+    def _update_segments(self, codec: Optional[str], block_size: int):
+        """
+        Update the saved segments in place, by writing the files of dirty features and dropping removed features
+        """
+        start = 0
+        for segment in self.meta.segments:
+            end = start + segment['size']
+            files = segment['files']
+            for name in list(files):
+                if name not in self.data:
+                    del files[name]
+            for name in self._dirty_features:
+                if name in self.data:
+                    files[name] = self._save_feature(name, start, end, segment['filename'], codec, block_size)
+            start = end
+
+    def _save_shards(self, num_shards: int, codec: Optional[str], block_size: int):
+        """
+        Save rows in num_shards even row ranges, each as its own segment, and record them in the shard manifest
+        """
+        for shard in range(num_shards):
+            start = shard * self._sample_size // num_shards
+            end = (shard + 1) * self._sample_size // num_shards
+            filename = f'data.{start}' if start else 'data'
+            self._save_segment(start, end, filename, codec, block_size)
+            self.meta.shards.append(dict(start=start, end=end, segments=[filename]))
+
+    def _get_layout(self):
+        """
+        :return: codec and block size of the saved files of the kept features, or (None, None) if uncompressed
+        """
+        for segment in self.meta.segments:
+            for name, files in segment.get('files', {}).items():
+                if name in self.data:
+                    return files.get('codec'), files.get('block_size')
+        return None, None
+
+    def _has_layout(self, codec: Optional[str], block_size: int):
+        """
+        :return: whether the saved files of the kept features are in the codec and block size,
+            otherwise they are rewritten, instead of mixing layouts in a saved table
+        """
+        layout = (Codecs.get(codec).name, block_size) if codec is not None else (None, None)
+        for segment in self.meta.segments:
+            for name, files in segment['files'].items():
+                if name in self.data and (files.get('codec'), files.get('block_size')) != layout:
+                    return False
+        return True
+
+    @staticmethod
+    def _get_segment_files(segment: dict):
+        if segment.get('format', 'pkl') == 'pkl':
+            return {segment['filename']}
+        keys = ('values', 'offsets', 'blocks', 'index')
+        return {files[key] for files in segment['files'].values() for key in keys if key in files}
+
     @Status.require_not_initialized
-    def save(self, save_dir: str):
-        self.save_dir = save_dir
-        os.makedirs(save_dir, exist_ok=True)
+    def save(self, save_dir: str, codec: Optional[str] = Symbols.keep, block_size: int = None, shards: int = None):
+        """
+        Save the UniTok table
+        Token data is saved in columnar numpy arrays, which can be memory-mapped by UniTok.load(mmap=True)
+        Each feature is saved in its own files, which are referenced in the segments of meta.json
+        When saving to the directory it is loaded from, only the files of added or modified features are written,
+        the files of removed features are deleted, and the appended rows are saved as a new segment
+        Vocabularies are only written when grown since loaded or saved, and files of removed vocabularies are deleted
+        :param codec: Compress the written files in row blocks, e.g., zlib, lzma, zstd, lz4,
+            or fast for the fastest installed codec, so that ut[i] decompresses only one block, None for uncompressed.
+            Symbols.keep to keep the codec of the loaded data, or uncompressed if not loaded.
+            When saving in place with another codec or block size than the saved files, all files are rewritten
+        :param block_size: Number of rows in each compressed block, None to keep the block size of the loaded data,
+            or 4096 if the loaded data is not compressed
+        :param shards: Save rows in shards of even row ranges, which are listed in the shard manifest of meta.json,
+            so that UniTok.load(shard=..., num_shards=shards) reads only the files of a shard.
+            None to keep the shards of the loaded data, and the appended rows are added to the last shard
+        """
+        if self._is_partial:
+            raise ValueError('partially loaded UniTok cannot be saved, please load all features and rows')
+        if block_size is not None and block_size <= 0:
+            raise ValueError(f'block_size should be positive, but {block_size} is given')
+        if shards is not None and not 0 < shards <= max(self._sample_size, 1):
+            raise ValueError(f'shards should be in [1, {max(self._sample_size, 1)}], but {shards} is given')
+
+        with self._observe('save', save_dir):
+            saved_codec, saved_block_size = self._get_layout()
+            if codec is Symbols.keep:
+                codec = saved_codec
+            if block_size is None:
+                block_size = saved_block_size or 4096
+            same_dir = self.save_dir is not None and os.path.abspath(save_dir) == os.path.abspath(self.save_dir)
+            self.save_dir = save_dir
+            os.makedirs(save_dir, exist_ok=True)
+
+            stale_files = set()
+            if same_dir:
+                stale_files = set().union(*map(self._get_segment_files, self.meta.segments))
+
+            is_columnar = all(segment.get('format', 'pkl') != 'pkl' for segment in self.meta.segments)
+            same_shards = shards is None or shards == len(self.meta.shards)
+            if same_dir and self._persisted_size and is_columnar and same_shards and self._has_layout(codec, block_size):
+                self._update_segments(codec, block_size)
+                if self._sample_size > self._persisted_size:
+                    filename = f'data.{self._persisted_size}'
+                    self._save_segment(self._persisted_size, self._sample_size, filename, codec, block_size)
+                    if self.meta.shards:
+                        self.meta.shards[-1]['end'] = self._sample_size
+                        self.meta.shards[-1]['segments'].append(filename)
+            else:
+                num_shards = shards or len(self.meta.shards)
+                self.meta.segments = []
+                self.meta.shards = []
+                if num_shards:
+                    self._save_shards(num_shards, codec, block_size)
+                else:
+                    self._save_segment(0, self._sample_size, 'data', codec, block_size)
+            stale_files -= set().union(*map(self._get_segment_files, self.meta.segments))
+            self._persisted_size = self._sample_size
+            self._dirty_features = set()
+
+            self.meta.save(self.save_dir)
+            # vocabularies that are not grown since loaded from or saved to the directory are not written again
+            for vocab in self.meta.vocabularies:
+                if not vocab.is_saved(save_dir):
+                    vocab.save(save_dir)
+            if same_dir:
+                for name, vocab in self._saved_vocabs.items():
+                    if not self.meta.vocabularies.has(name):
+                        vocab.remove(save_dir)
+            self._saved_vocabs = {vocab.name: vocab for vocab in self.meta.vocabularies}
+            if self.reports:
+                Report.save(self.reports, save_dir)
+
+            for filename in stale_files:
+                filepath = os.path.join(save_dir, filename)
+                if os.path.exists(filepath):
+                    os.remove(filepath)
+
+    def _export_columns(self, features: Optional[Iterable[str]]):
+        """
+        :return: token arrays of the legal rows of each feature, i.e., rows removed by filter() are not exported
+        """
+        if features is None:
+            # the key feature is the first column
+            names = [self.key_feature.name]
+            names += [f.name for f in self.meta.features if f.name in self.data and f.name != self.key_feature.name]
+        else:
+            names = [feature.name if isinstance(feature, Feature) else feature for feature in features]
+            for name in names:
+                if name not in self.data:
+                    raise ValueError(f'feature {name} is not tokenized or loaded')
+
+        indices = None
+        if len(self._legal_indices) != self._sample_size:
+            indices = np.asarray(self._legal_indices, dtype=np.int64)
+
+        columns = dict()
+        for name in names:
+            column_class = self._get_column_class(name)
+            arrays = column_class.export_lines(self.data[name])
+            if indices is not None:
+                arrays = column_class.take(arrays, indices)
+            columns[name] = column_class.astype(arrays, self.meta.features[name].dtype)
+        return columns
 
-        self.meta.save(self.save_dir)
-        for vocab in self.meta.vocabularies:
-            vocab.save(save_dir)
-        PickleHandler.save(self.data, self.filepath)
+    @Status.require_not_initialized
+    def export_parquet(
+            self,
+            path: str,
+            features: Iterable[Union[Feature, str]] = None,
+            engine: str = None,
+            row_group_size: int = None,
+    ):
+        """
+        Export token ids of the features as a parquet file, where list features are int list columns
+        :param features: Exported features, None for all tokenized features
+        :param engine: pyarrow or fastparquet, None for pyarrow if installed, otherwise fastparquet,
+            which writes list features as json-encoded int lists as it does not support nested columns
+        :param row_group_size: Number of rows in each row group, None for the default of the engine
+        """
+        TableHandler.save_parquet(self._export_columns(features), path, engine=engine, row_group_size=row_group_size)
+        return self
 
-    @property
-    def filepath(self):
-        return os.path.join(self.save_dir, 'data.pkl')
+    @Status.require_not_initialized
+    def export_arrow(self, path: str, features: Iterable[Union[Feature, str]] = None):
+        """
+        Export token ids of the features as an arrow ipc file, which requires pyarrow
+        :param features: Exported features, None for all tokenized features
+        """
+        TableHandler.save_arrow(self._export_columns(features), path)
+        return self
 
     def __enter__(self):
         from unitok.utils import Space
@@ -209,16 +669,256 @@ class UniTok(Status):
                 raise ValueError(f'Key column already exists: {self.key_feature.name}')
             self.key_feature = feature
 
-    @Status.require_not_organized
-    def tokenize(self, df: pd.DataFrame):
-        # TODO: in different times, the order of the primary key may be different, a sort operation is needed
-        # validate whether each column exists in the dataframe
-        for feature in self.meta.features:
-            if feature.is_processed or feature.column == self.idx:
+    @staticmethod
+    def _tokenize_values(
+            tokenizer: BaseTokenizer,
+            values,
+            truncate: Optional[int],
+            chunk_size: int,
+            callback: Callable = None,
+    ):
+        """
+        :param callback: Called with the number of rows after each chunk is tokenized
+        """
+        slicer = Feature.get_slice(truncate)
+        token_lines = []
+        for start in range(0, len(values), chunk_size):
+            lines = tokenizer.cached_batch_call(values[start:start + chunk_size].tolist(), truncate=truncate)
+            if tokenizer.return_list:
+                lines = [line[slicer] for line in lines]
+            token_lines.extend(lines)
+            if callback is not None:
+                callback(len(lines))
+        return token_lines
+
+    @staticmethod
+    def _tokenize_shard(tokenizer: BaseTokenizer, values, truncate: Optional[int], chunk_size: int):
+        """
+        Tokenize a shard of values in a worker process, where the tokenizer holds a shard-local copy of the vocabulary
+        """
+        vocab = tokenizer.vocab
+        offset = len(vocab)
+        vocab.counter.initialize()
+        tokenizer.vocab_time = 0.0
+        cache = tokenizer.cache
+        cache_stats = (cache.hits, cache.misses) if cache is not None else (0, 0)
+
+        start = time.perf_counter()
+        token_lines = UniTok._tokenize_values(tokenizer, values, truncate, chunk_size)
+        elapsed = time.perf_counter() - start
+        # hits and misses of the shard-local cache, which are merged into the cache statistics of the main process
+        if cache is not None:
+            cache_stats = (cache.hits - cache_stats[0], cache.misses - cache_stats[1])
+        return (token_lines, elapsed, tokenizer.vocab_time, cache_stats, offset, *vocab.export_shard(offset))
+
+    def _tokenize_parallel(
+            self,
+            tokenizer: BaseTokenizer,
+            values,
+            truncate: Optional[int],
+            chunk_size: int,
+            executor: ProcessPoolExecutor,
+            workers: int,
+            callback: Callable = None,
+    ):
+        """
+        Tokenize values in shards, and merge the shard-local vocabularies in shard order,
+        so that the token ids are identical to a serial run
+        :param callback: Called with the number of rows after each shard is merged
+        :return: token lines, and the time spent by the tokenizer summed over worker processes
+        """
+        vocab = tokenizer.vocab
+        shard_size = max((len(values) + workers - 1) // workers, 1)
+        shards = [values[start:start + shard_size] for start in range(0, len(values), shard_size)]
+
+        token_lines = []
+        busy_time = 0.0
+        futures = [executor.submit(self._tokenize_shard, tokenizer, shard, truncate, chunk_size) for shard in shards]
+        for future in futures:
+            lines, elapsed, vocab_time, (hits, misses), offset, objs, counts = future.result()
+            if tokenizer.cache is not None:
+                tokenizer.cache.hits += hits
+                tokenizer.cache.misses += misses
+
+            start = time.perf_counter()
+            mapping = vocab.merge_shard(objs, counts, offset)
+            merge_time = time.perf_counter() - start
+            busy_time += elapsed + merge_time
+            tokenizer.vocab_time += vocab_time + merge_time
+
+            if mapping != list(range(offset, offset + len(mapping))):
+                def remap(index):
+                    return index if index < offset else mapping[index - offset]
+                if tokenizer.return_list:
+                    lines = [[remap(index) for index in line] for line in lines]
+                else:
+                    lines = [remap(index) for index in lines]
+            token_lines.extend(lines)
+            if callback is not None:
+                callback(len(lines))
+        return token_lines, busy_time
+
+    @staticmethod
+    def _group_features(features: Iterable[Feature]):
+        """
+        Group features by their column and tokenizer, so that each group is tokenized only once
+        Features whose vocabulary counter is activated are not grouped, to keep the token counts
+        """
+        groups = dict()
+        for feature in features:
+            if feature.tokenizer.vocab.counter.is_active:
+                groups[feature] = [feature]
+            else:
+                groups.setdefault((feature.column, feature.tokenizer), []).append(feature)
+        return list(groups.values())
+
+    @staticmethod
+    def _get_widest_truncate(features: list):
+        """
+        Get the truncation that covers the truncations of all features in the group
+        """
+        truncates = {feature.truncate for feature in features}
+        if None in truncates:
+            return None
+        if 0 in truncates or (max(truncates) > 0 > min(truncates)):
+            return 0
+        if max(truncates) > 0:
+            return max(truncates)
+        return min(truncates)
+
+    def _get_pending_features(self):
+        return [feature for feature in self.meta.features if not feature.is_processed]
+
+    def _validate_columns(self, df: pd.DataFrame, features: Iterable[Feature]):
+        for feature in features:
+            if feature.column == self.idx:
                 continue
             if feature.column not in df.columns:
                 raise ValueError(f'Column {feature.column} not found in dataframe')
 
+    @staticmethod
+    def _get_executor(workers: Optional[int]):
+        if workers is not None and workers > 1:
+            return ProcessPoolExecutor(max_workers=workers)
+        return nullcontext()
+
+    def _tokenize_dataframe(
+            self,
+            df: pd.DataFrame,
+            index,
+            groups: list,
+            token_data: dict,
+            chunk_size: int,
+            executor: Optional[ProcessPoolExecutor],
+            workers: int,
+            report: Report,
+            progress: bool = True,
+    ):
+        """
+        Tokenize the dataframe by groups of features, and append the token lines to token_data
+        :param index: Values of the UniTok.idx column
+        """
+        for features in groups:
+            tokenizer = features[0].tokenizer
+            column = features[0].column
+            truncate = self._get_widest_truncate(features)
+            info(f'Tokenizing features: {tokenizer} ({column} -> {", ".join(f.name for f in features)})')
+
+            values = index if column == self.idx else df[column].to_numpy()
+
+            vocab_size, vocab_time = len(tokenizer.vocab), tokenizer.vocab_time
+            start = time.perf_counter()
+
+            self._notify('on_feature_start', features)
+            try:
+                with tqdm(total=len(values), disable=not progress) as bar:
+                    def callback(rows):
+                        bar.update(rows)
+                        self._notify('on_chunk', features, rows)
+
+                    if executor is not None:
+                        token_lines, busy_time = self._tokenize_parallel(
+                            tokenizer, values, truncate, chunk_size, executor, workers, callback)
+                    else:
+                        token_lines = self._tokenize_values(tokenizer, values, truncate, chunk_size, callback)
+                        busy_time = None
+            finally:
+                # observers stop profiling or tracing even if the tokenizer fails
+                self._notify('on_feature_end', features)
+
+            if tokenizer.cache is not None:
+                info(f'Tokenizer cache of {tokenizer}: {tokenizer.cache}')
+
+            tokens = dict()
+            shared = False  # token lines are used as is by at most one feature
+            for feature in features:
+                if not feature.return_list:
+                    lines = token_lines if not shared else list(token_lines)
+                elif feature.truncate == truncate and not shared:
+                    lines = token_lines
+                else:
+                    lines = [line[feature.slice] for line in token_lines]
+                shared = shared or lines is token_lines
+
+                if feature.return_list:
+                    feature.max_len = max(feature.max_len, max(map(len, lines), default=0))
+                    tokens[feature.name] = sum(map(len, lines))
+                else:
+                    tokens[feature.name] = len(lines)
+
+                if feature.name in token_data:
+                    token_data[feature.name].extend(lines)
+                else:
+                    token_data[feature.name] = lines
+
+            wall_time = time.perf_counter() - start
+            vocab_time = tokenizer.vocab_time - vocab_time
+            if busy_time is None:
+                busy_time = wall_time
+            for feature in features:
+                report.record(
+                    feature=feature,
+                    group=[f.name for f in features],
+                    rows=len(values),
+                    tokens=tokens[feature.name],
+                    wall_time=wall_time,
+                    tokenizer_time=busy_time - vocab_time,
+                    vocab_time=vocab_time,
+                    vocab_size=len(tokenizer.vocab),
+                    vocab_growth=len(tokenizer.vocab) - vocab_size,
+                )
+
+    def _set_tokenized(self, groups: list, token_data: dict, sample_size: int):
+        if self._indices_is_init and self._sample_size != sample_size:
+            raise ValueError(f'sample size mismatch: {self._sample_size} != {sample_size}')
+
+        order_index = self.meta.features.next_order()
+        for features in groups:
+            for feature in features:
+                feature.order = order_index
+                self.data[feature.name] = token_data.get(feature.name, [])
+                self._dirty_features.add(feature.name)
+        self._clear_row_cache()
+        self._clear_loaded_names()
+
+        self.status = Symbols.tokenized
+        if not self._indices_is_init:
+            self.init_indices()
+
+    @Status.require_not_organized
+    def tokenize(self, df: pd.DataFrame, chunk_size: int = 10_000, workers: int = None):
+        """
+        Tokenize the dataframe by the registered features
+        Features with the same column and tokenizer are tokenized once, and then sliced by their own truncations
+        :param df: Dataframe to tokenize
+        :param chunk_size: Number of rows passed to the tokenizer in each batch call
+        :param workers: Number of worker processes, rows are split into shards when workers > 1
+        """
+        # TODO: in different times, the order of the primary key may be different, a sort operation is needed
+        # validate whether each column exists in the dataframe
+        features = self._get_pending_features()
+        self._validate_columns(df, features)
+
         # add index to the index vocabulary
         if self.key_feature is None:
             raise ValueError(f'key key should be set')
@@ -228,32 +928,147 @@ class UniTok(Status):
         if self._indices_is_init and self._sample_size != len(df):
             raise ValueError(f'sample size mismatch: {self._sample_size} != {len(df)}')
 
-        order_index = self.meta.features.next_order()
-        for feature in self.meta.features:
-            info(f'Tokenizing feature: {feature.tokenizer} ({feature.column} -> {feature.name})')
+        groups = self._group_features(features)
+        token_data = dict()
+        report = Report('tokenize', workers=workers)
+        with self._observe_tokenize('tokenize', features), self._get_executor(workers) as executor:
+            self._tokenize_dataframe(df, df.index.to_numpy(), groups, token_data, chunk_size, executor, workers, report)
+            self._set_tokenized(groups, token_data, len(df))
+            self.reports.append(report.finish(self._sample_size).json())
+        self._notify('on_tokenize_end', 'tokenize', self.report)
+        return self
 
-            if feature.is_processed:  # already tokenized
-                continue
+    @Status.require_not_organized
+    def tokenize_stream(self, chunks: Iterable[pd.DataFrame], chunk_size: int = 10_000, workers: int = None):
+        """
+        Tokenize a stream of dataframe chunks, e.g., pd.read_csv(..., chunksize=...), without holding the raw table
+        Rows of UniTok.idx column are numbered by their positions in the stream
+        :param chunks: Iterable of dataframes with the same columns
+        :param chunk_size: Number of rows passed to the tokenizer in each batch call
+        :param workers: Number of worker processes, rows are split into shards when workers > 1
+        """
+        if self.key_feature is None:
+            raise ValueError(f'key key should be set')
 
-            token_lines = []
-            for i, row in tqdm(df.iterrows(), total=len(df)):
-                if feature.column == self.idx:
-                    value = i
-                else:
-                    value = row[feature.column]
-                line = feature.tokenizer(value)
-                if feature.tokenizer.return_list:
-                    line = line[feature.slice]
-                    feature.max_len = max(feature.max_len, len(line))
-                token_lines.append(line)
+        features = self._get_pending_features()
+        groups = self._group_features(features)
+        token_data = dict()
+        sample_size = 0
+        report = Report('tokenize_stream', workers=workers)
+        with self._observe_tokenize('tokenize_stream', features), self._get_executor(workers) as executor:
+            with tqdm(unit='rows') as bar:
+                for df in chunks:
+                    self._validate_columns(df, features)
+
+                    index = np.arange(sample_size, sample_size + len(df))
+                    if self.key_feature.column is self.idx and len(df):
+                        self.key_feature.tokenizer(index[-1])
+
+                    self._tokenize_dataframe(
+                        df, index, groups, token_data, chunk_size, executor, workers, report, progress=False)
+
+                    sample_size += len(df)
+                    bar.update(len(df))
+
+            self._set_tokenized(groups, token_data, sample_size)
+            self.reports.append(report.finish(self._sample_size).json())
+        self._notify('on_tokenize_end', 'tokenize_stream', self.report)
+        return self
 
-            feature.order = order_index
-            self.data[feature.name] = token_lines
+    def tokenize_file(
+            self,
+            filepath: str,
+            chunk_size: int = 10_000,
+            workers: int = None,
+            read_size: int = 100_000,
+            prefetch: int = 2,
+            **kwargs,
+    ):
+        """
+        Tokenize a csv, tsv or parquet file chunk by chunk, where only the columns of the pending features are read
+        Parquet files are read by row groups, and csv files by chunks of read_size rows
+        :param chunk_size: Number of rows passed to the tokenizer in each batch call
+        :param workers: Number of worker processes, rows are split into shards when workers > 1
+        :param read_size: Maximum number of rows in each chunk read from the file
+        :param prefetch: Number of chunks read ahead in a background thread while tokenizing, 0 to disable
+        :param kwargs: Options of the file reader, e.g., sep of pd.read_csv
+        """
+        columns = []
+        for feature in self._get_pending_features():
+            if feature.column != self.idx and feature.column not in columns:
+                columns.append(feature.column)
 
-        self.status = Symbols.tokenized
-        if not self._indices_is_init:
-            self.init_indices()
+        chunks = Readers.get(filepath, columns=columns, read_size=read_size, **kwargs)
+        if prefetch:
+            chunks = Prefetcher(chunks, size=prefetch)
+        return self.tokenize_stream(chunks, chunk_size=chunk_size, workers=workers)
 
+    @property
+    def report(self) -> Optional[dict]:
+        """
+        Performance report of the last tokenization run
+        """
+        return self.reports[-1] if self.reports else None
+
+    def _check_appended_keys(self, keys: list, vocab, vocab_size: int):
+        """
+        Check that the appended keys are new and in order, i.e., their key ids follow the existing rows,
+        otherwise the appended tokens are removed from the key vocabulary
+        :param vocab_size: Size of the key vocabulary before the keys are tokenized
+        """
+        for offset, key_id in enumerate(keys):
+            if key_id != self._sample_size + offset:
+                key = vocab[key_id]
+                vocab.shrink(vocab_size)
+                raise ValueError(f'appended key {key} of row {offset} has key id {key_id}, '
+                                 f'but {self._sample_size + offset} is expected, '
+                                 f'as appended keys should be new and follow the existing rows')
+
+    @Status.require_tokenized
+    def append(self, df: pd.DataFrame, chunk_size: int = 10_000, workers: int = None):
+        """
+        Append new rows to the tokenized table, which are tokenized by the existing features and vocabularies
+        Rows of UniTok.idx column are numbered after the existing rows, and keys of the new rows should be new,
+        as their key ids are the row indices
+        :param df: Dataframe of the new rows, containing columns of all features
+        :param chunk_size: Number of rows passed to the tokenizer in each batch call
+        :param workers: Number of worker processes, rows are split into shards when workers > 1
+        """
+        if self._is_partial:
+            raise ValueError('rows cannot be appended to a partially loaded UniTok')
+
+        features = list(self.meta.features)
+        self._validate_columns(df, features)
+
+        index = np.arange(self._sample_size, self._sample_size + len(df))
+        if self.key_feature.column is self.idx and len(df):
+            self.key_feature.tokenizer(index[-1])
+
+        groups = self._group_features(features)
+        key_groups = [group for group in groups if any(feature is self.key_feature for feature in group)]
+        token_data = dict()
+        report = Report('append', workers=workers)
+        with self._observe_tokenize('append', features), self._get_executor(workers) as executor:
+            # key ids are the row indices, so the key feature is checked before the other features are tokenized
+            vocab = self.key_feature.tokenizer.vocab
+            vocab_size = len(vocab)
+            self._tokenize_dataframe(df, index, key_groups, token_data, chunk_size, executor, workers, report)
+            self._check_appended_keys(token_data[self.key_feature.name], vocab, vocab_size)
+
+            groups = [group for group in groups if group not in key_groups]
+            self._tokenize_dataframe(df, index, groups, token_data, chunk_size, executor, workers, report)
+
+            for feature in features:
+                self.data[feature.name].extend(token_data[feature.name])
+
+            start = self._sample_size
+            self._sample_size += len(df)
+            self._legal_indices.extend(range(start, self._sample_size))
+            self._legal_flags.extend([True] * len(df))
+            self._clear_row_cache()
+
+            self.reports.append(report.finish(self._sample_size).json())
+        self._notify('on_tokenize_end', 'append', self.report)
         return self
 
     """
@@ -269,45 +1084,55 @@ class UniTok(Status):
         :param soft_union: Two tables are stored separately and the union is performed on the fly
         :param union_key: Key column to link two tables
         """
+        with self._observe('union', other, soft_union):
+            self.set_union_type(soft_union)
+            self._clear_row_cache()
+            self._clear_loaded_names()
 
-        self.set_union_type(soft_union)
+            if union_key is None:
+                union_key = other.key_feature.name
 
-        if union_key is None:
-            union_key = other.key_feature.name
+            if not self.meta.features.has(union_key):
+                raise KeyError(f'union key {union_key} not found in the table')
 
-        if not self.meta.features.has(union_key):
-            raise KeyError(f'union key {union_key} not found in the table')
+            current_feature = self.meta.features[union_key]
+            other_feature = other.key_feature
 
-        current_feature = self.meta.features[union_key]
-        other_feature = other.key_feature
+            if not current_feature.is_processed or not other_feature.is_processed:
+                raise ValueError('feature of union key should be processed')
 
-        if not current_feature.is_processed or not other_feature.is_processed:
-            raise ValueError('feature of union key should be processed')
+            if not current_feature.tokenizer.vocab.equals(other_feature.tokenizer.vocab):
+                raise ValueError(f'union key vocab mismatch: '
+                                 f'{current_feature.tokenizer.vocab} != {other_feature.tokenizer.vocab}')
 
-        if not current_feature.tokenizer.vocab.equals(other_feature.tokenizer.vocab):
-            raise ValueError(f'union key vocab mismatch: {current_feature.tokenizer.vocab} != {other_feature.tokenizer.vocab}')
+            rows = None
+            if not soft_union:
+                # rows are looked up before merging the meta, so that keys out of the loaded rows leave the table as is
+                rows = [other._get_union_row(index, union_key) for index in self.data[current_feature.name]]
 
-        self.meta.vocabularies.merge(other.meta.vocabularies)
-        self.meta.tokenizers.merge(other.meta.tokenizers)
-        self.meta.features.merge(other.meta.features, key_feature=other.key_feature)
+            self.meta.vocabularies.merge(other.meta.vocabularies)
+            self.meta.tokenizers.merge(other.meta.tokenizers)
+            self.meta.features.merge(other.meta.features, key_feature=other.key_feature)
 
-        if soft_union:
-            """ Soft union, store the union relationship and union on the fly """
-            if current_feature not in self._soft_unions:
-                self._soft_unions[current_feature] = set()
-            self._soft_unions[current_feature].add(other)
-            return
+            if soft_union:
+                """ Soft union, store the union relationship and union on the fly """
+                if current_feature not in self._soft_unions:
+                    self._soft_unions[current_feature] = set()
+                self._soft_unions[current_feature].add(other)
+                other._union_parents.add(self)
+                return
 
-        """ Hard union, union the tables directly """
-        union_data = {feature.name: [] for feature in other.meta.features}
+            """ Hard union, union the tables directly """
+            union_data = {feature.name: [] for feature in other.meta.features}
 
-        for index in self.data[current_feature.name]:
-            for feature in other.meta.features:
-                union_data[feature.name].append(other.data[feature.name][index])
+            for row in rows:
+                for feature in other.meta.features:
+                    union_data[feature.name].append(other.data[feature.name][row])
 
-        for feature in other.meta.features:
-            if feature is not other.key_feature:
-                self.data[feature.name] = union_data[feature.name]
+            for feature in other.meta.features:
+                if feature is not other.key_feature:
+                    self.data[feature.name] = union_data[feature.name]
+                    self._dirty_features.add(feature.name)
 
     @Status.require_not_initialized
     @Status.to_organized
@@ -323,12 +1148,14 @@ class UniTok(Status):
 
         new_feature = feature.clone(name=new_name)
         self.meta.features.add(new_feature)
+        self._dirty_features.add(new_feature.name)
 
         if lazy or not feature.return_list:
             self.data[new_feature.name] = self.data[feature.name]
         else:
             # deep copy the data
             self.data[new_feature.name] = [line.copy() for line in self.data[feature.name]]
+        self._clear_loaded_names()
 
     @Status.require_not_initialized
     def summarize(self):
@@ -375,30 +1202,98 @@ class UniTok(Status):
         console.print(introduction_header)
         console.print(table)
 
-    def _pack_soft_union(self, index):
-        sample = dict()
-        for feature in self.meta.features:
-            if not feature.from_union:
-                sample[feature.name] = self.data[feature.name][index]
+    def _pack_soft_union(self, index, names: list):
+        sample = self._pack_hard_union(index, names)
+        pending = [name for name in names if name not in self.data]
+
+        for feature, others in self._soft_unions.items():
+            for other in others:
+                other_names = other._get_loaded_names()
+                wanted = [name for name in pending if name in other_names]
+                # unions whose features are not selected are not joined
+                if not wanted:
+                    continue
+                sample.update(other.pack(other._get_union_row(self.data[feature.name][index], feature.name), wanted))
+                pending = [name for name in pending if name not in wanted]
+
+        if pending:
+            raise ValueError(f'features {", ".join(pending)} are not tokenized or loaded')
+        return sample
 
-        for feature in self._soft_unions:
-            index = sample[feature.name]
-            for ut in self._soft_unions[feature]:
-                sample.update(ut[index])
+    def _get_union_row(self, key_id, key: str):
+        """
+        :param key_id: Key id of this table, which is referenced by the union key of another table
+        :return: row index of the key id, which is shifted by the loaded row range
+        """
+        row = int(key_id) - self._row_offset
+        if not 0 <= row < self._sample_size:
+            raise ValueError(f'union key {key_id} of {key} is not in the loaded rows of {self}')
+        return row
 
-        return sample
+    def _pack_hard_union(self, index, names: list):
+        # features that are not loaded, e.g., by UniTok.load(features=...), are not in names
+        return {name: self.data[name][index] for name in names if name in self.data}
 
-    def _pack_hard_union(self, index):
-        sample = dict()
-        for feature in self.meta.features:
-            sample[feature.name] = self.data[feature.name][index]
-        return sample
+    def start_caching(self, max_memory: int = 256 * 1024 * 1024, policy: str = 'lfu'):
+        """
+        Cache the packed rows within a memory budget, e.g., on the target table of soft unions,
+        where the rows of popular items are packed again and again
+        Cached samples are copied when returned, so that modifying a returned sample does not affect the cache
+        :param max_memory: Memory budget of the cached rows in bytes
+        :param policy: lfu or lru eviction of the cached rows
+        """
+        self.row_cache = Cache(max_memory=max_memory, policy=policy, sizeof=function.get_sample_size)
+        return self
+
+    def stop_caching(self):
+        self.row_cache = None
+        return self
+
+    def _clear_row_cache(self):
+        # cached rows are outdated once the data is modified, including the rows joined by soft-unioning tables
+        if self.row_cache is not None:
+            self.row_cache.clear()
+        for parent in self._union_parents:
+            parent._clear_row_cache()
 
     @Status.require_not_initialized
-    def pack(self, index):
+    def pack(self, index, names: list = None):
+        """
+        :param index: Row index
+        :param names: Names of the features to fetch, None for all loaded features
+        """
+        if names is None:
+            names = self._get_loaded_names()
+        if self.row_cache is None:
+            return self._pack(index, names)
+
+        key = (index, tuple(names))
+        sample = self.row_cache.get(key)
+        if sample is None:
+            sample = self._pack(index, names)
+            self.row_cache.set(key, sample)
+        return {name: value.copy() if isinstance(value, (list, np.ndarray)) else value for name, value in sample.items()}
+
+    def _pack(self, index, names: list):
         if self.is_soft_union:
-            return self._pack_soft_union(index)
-        return self._pack_hard_union(index)
+            return self._pack_soft_union(index, names)
+        sample = self._pack_hard_union(index, names)
+        if len(sample) < len(names):
+            missing = [name for name in names if name not in sample]
+            raise ValueError(f'features {", ".join(missing)} are not tokenized or loaded')
+        return sample
+
+    def _get_selector(self, selector) -> Selector:
+        if isinstance(selector, Selector):
+            return selector
+        if not isinstance(selector, tuple):
+            selector = (selector,)
+        try:
+            if selector not in self._selectors:
+                self._selectors[selector] = Selector(self.meta, *selector)
+            return self._selectors[selector]
+        except TypeError:  # unhashable selectors are not cached
+            return Selector(self.meta, *selector)
 
     def _parse_index(self, index) -> [int, Optional[Selector]]:
         selector = None
@@ -406,14 +1301,14 @@ class UniTok(Status):
             if len(index) != 2:
                 raise ValueError('index should be tuple with 2 elements: (index, selector)')
             index, selector = index
-            if not isinstance(selector, Selector):
-                if not isinstance(selector, tuple):
-                    selector = (selector,)
-                selector = Selector(self.meta, *selector)
+            selector = self._get_selector(selector)
 
         if isinstance(index, str):
             # key_id is used
-            index = self.key_feature.tokenizer.vocab[index]
+            key = index
+            index = self.key_feature.tokenizer.vocab[key] - self._row_offset
+            if index < 0 or index >= self._sample_size:
+                raise ValueError(f'sample {key} is not in the loaded rows')
             if not self._legal_flags[index]:
                 raise ValueError(f'current sample has been filtered out: {index}')
         else:
@@ -433,20 +1328,150 @@ class UniTok(Status):
         ut['abc']: sample index can be replaced by key_id
         """
         index, selector = self._parse_index(index)
-        sample = self.pack(index)
-
         if selector is None:
-            return sample
+            return self.pack(index)
+        # only the selected features are fetched, and unions of unselected features are not joined
+        return self.pack(index, selector.compile(self._get_loaded_names()))
+
+    def _get_rows(self, indices) -> np.ndarray:
+        """
+        :return: row indices of the samples, where sample indices are positions in the legal indices as in ut[i]
+        """
+        indices = np.asarray(indices)
+        if indices.size and indices.dtype.kind not in 'iu':
+            raise ValueError(f'sample indices should be integers, but {indices.dtype} is given')
+        indices = indices.astype(np.int64).reshape(-1)
+        size = len(self._legal_indices)
+        if indices.size and (indices.min() < -size or indices.max() >= size):
+            raise IndexError(f'sample index out of range for UniTok of size {size}')
+        indices = np.where(indices < 0, indices + size, indices)
+        if size == self._sample_size:
+            return indices
+
+        if self._legal_array is None or len(self._legal_array) != size:
+            self._legal_array = np.asarray(self._legal_indices, dtype=np.int64)
+        return self._legal_array[indices]
+
+    def _gather(self, name: str, rows: np.ndarray):
+        """
+        :return: token arrays of a feature at the row indices, in the storage dtype of the feature
+        """
+        data = self.data[name]
+        column_class = self._get_column_class(name)
+        if isinstance(data, Column):
+            arrays = data.gather(rows)
+        else:
+            arrays = column_class.from_lines([data[row] for row in rows])
+        return column_class.astype(arrays, self.meta.features[name].dtype)
 
-        return selector(sample)
+    def _get_loaded_names(self) -> list:
+        """
+        :return: names of the features that can be gathered, including the features of soft-unioned tables,
+            which are computed once until features are added or removed
+        """
+        if self._loaded_names is None:
+            names = list(self.data)
+            for others in self._soft_unions.values():
+                for other in others:
+                    names.extend(name for name in other._get_loaded_names() if name not in names)
+            self._loaded_names = names
+        return self._loaded_names
+
+    def _clear_loaded_names(self):
+        # loaded names are outdated once features are added or removed, including those of soft-unioning tables
+        self._loaded_names = None
+        for parent in self._union_parents:
+            parent._clear_loaded_names()
+
+    def _get_join_plan(self, names: list, candidates: list) -> JoinPlan:
+        """
+        :param candidates: Loaded features, which outdate the cached plan when changed
+        :return: join plan of the selected features, which is computed once for a selection
+        """
+        key, candidates = tuple(names), tuple(candidates)
+        plan = self._join_plans.get(key)
+        if plan is None or plan.candidates != candidates:
+            plan = self._join_plans[key] = JoinPlan(self, names, candidates=candidates)
+        return plan
+
+    @Status.require_not_initialized
+    def get_batch(
+            self,
+            indices,
+            features: Iterable[Union[Feature, str]] = None,
+            pad: int = None,
+            pad_value: int = 0,
+            dtype=np.int64,
+    ):
+        """
+        Get samples as numpy arrays of each feature, which are gathered from the token arrays without packing samples
+        Atomic features are 1-D arrays, and list features are 2-D matrices padded by pad_value,
+        with the lengths and masks of the rows keyed by <name>_length and <name>_mask
+        Features of soft-unioned tables are gathered by the union key ids of the samples, following the join plan,
+        where each distinct key is gathered once, e.g., popular items in a batch of interactions
+        :param indices: Sample indices as in ut[i], i.e., positions in the filtered samples
+        :param features: Names, features, tokenizers or vocabularies to select, None for all loaded features
+        :param pad: Width of the padded matrices, where longer rows are truncated, None for the longest row in the batch
+        :param pad_value: Value of the padded positions
+        :param dtype: Dtype of the token arrays, e.g., int64 that torch.from_numpy accepts and negative values fit in,
+            None for the narrow storage dtypes of the features
+        """
+        if pad is not None and pad < 0:
+            raise ValueError(f'pad should be non-negative, but {pad} is given')
+
+        candidates = self._get_loaded_names()
+        names = candidates
+        if features is not None:
+            # a single feature name is a selector by itself, rather than an iterable of characters
+            if not isinstance(features, (str, Feature, BaseTokenizer, Vocab, Selector)):
+                features = tuple(features)
+            names = self._get_selector(features).compile(candidates)
+
+        rows = self._get_rows(indices)
+        batch = dict()
+        for name, arrays in self._get_join_plan(names, candidates).gather(rows).items():
+            if not self.meta.features[name].return_list:
+                batch[name] = arrays if dtype is None else arrays.astype(dtype, copy=False)
+                continue
+            if dtype is not None:
+                arrays = arrays[0].astype(dtype, copy=False), arrays[1]
+            lengths = arrays[1][1:] - arrays[1][:-1]
+            width = pad if pad is not None else int(lengths.max(initial=0))
+            batch[name], batch[f'{name}_length'] = ListColumn.pad(arrays, width, pad_value)
+            batch[f'{name}_mask'] = np.arange(width) < batch[f'{name}_length'][:, None]
+        return batch
+
+    @Status.require_not_initialized
+    def iter_batches(
+            self,
+            batch_size: int,
+            shuffle: bool = False,
+            seed: int = None,
+            drop_last: bool = False,
+            num_workers: int = 0,
+            prefetch: int = None,
+            **kwargs,
+    ) -> BatchIterator:
+        """
+        Iterate batches of get_batch, which are assembled by worker threads while the current batch is consumed
+        e.g., for batch in ut.iter_batches(256, shuffle=True, num_workers=4, features=['title', 'uid'])
+        :param batch_size: Number of samples in each batch
+        :param shuffle: Shuffle the samples, which are reshuffled in each iteration
+        :param seed: Seed of the shuffling
+        :param drop_last: Drop the last batch if it is smaller than batch_size
+        :param num_workers: Number of worker threads, 0 to assemble batches in the consumer thread
+        :param prefetch: Number of batches assembled ahead of the consumer, None for twice the number of workers
+        :param kwargs: Parameters of get_batch, i.e., features, pad, pad_value and dtype
+        :return: iterable of batches, with the throughput counters of the last iteration
+        """
+        return BatchIterator(
+            self, batch_size, shuffle=shuffle, seed=seed, drop_last=drop_last,
+            num_workers=num_workers, prefetch=prefetch, **kwargs,
+        )
 
     @Status.require_not_initialized
     def select(self, sample, selector: Union[Selector, str, Feature, tuple]):
-        if not isinstance(selector, Selector):
-            if not isinstance(selector, tuple):
-                selector = (selector,)
-            selector = Selector(self.meta, *selector)
-        return selector(sample)
+        return self._get_selector(selector)(sample)
 
     def __len__(self):
         return len(self._legal_indices)
@@ -468,23 +1493,23 @@ class UniTok(Status):
         if isinstance(feature, Feature):
             feature = feature.name
 
-        _legal_indices = []
-        _legal_flags = [False] * self._sample_size
+        with self._observe('filter', feature):
+            _legal_indices = []
+            _legal_flags = [False] * self._sample_size
 
-        if feature is not None:
-            for index in self._legal_indices:
-                if filter_func(self.data[feature][index]):
-                    _legal_indices.append(index)
-                    _legal_flags[index] = True
-        else:
-            for sample in self:
-                if filter_func(sample):
-                    index = sample[self.key_feature.name]
-                    _legal_indices.append(index)
-                    _legal_flags[index] = True
-
-        self._legal_indices = _legal_indices
-        self._legal_flags = _legal_flags
+            if feature is not None:
+                for index in self._legal_indices:
+                    if filter_func(self.data[feature][index]):
+                        _legal_indices.append(index)
+                        _legal_flags[index] = True
+            else:
+                for index in self._legal_indices:
+                    if filter_func(self.pack(index)):
+                        _legal_indices.append(index)
+                        _legal_flags[index] = True
+
+            self._legal_indices = _legal_indices
+            self._legal_flags = _legal_flags
         return self
 
     @Status.require_not_initialized
@@ -516,6 +1541,8 @@ class UniTok(Status):
 
         feature.max_len = max_len
         self.data[feature.name] = series
+        self._dirty_features.add(feature.name)
+        self._clear_row_cache()
 
     def remove_feature(self, feature: Union[Feature, str]):
         if isinstance(feature, str):
@@ -540,7 +1567,10 @@ class UniTok(Status):
                 self.meta.vocabularies.remove(vocab)
 
         if feature.is_processed:
-            self.data.pop(feature.name)
+            # files of the feature are deleted when saved
+            del self.data[feature.name]
+            self._clear_row_cache()
+            self._clear_loaded_names()
 
     def remove_job(self, feature: Union[Feature, str]):
         warnings.warn(f'`remove_job` is deprecated, use `remove_feature` instead.', DeprecationWarning, stacklevel=2)
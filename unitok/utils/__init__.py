@@ -2,11 +2,13 @@ from unitok.utils.verbose import Verbose, warning, error, info, debug
 from unitok.utils.space import Space
 from unitok.utils.instance import Instance
 from unitok.utils.map import Map
+from unitok.utils.cache import Cache
 from unitok.utils.symbol import Symbols, Symbol
 from unitok.utils.handler import JsonHandler, PickleHandler
 
 __all__ = [
     'Map',
+    'Cache',
     'Space',
     'Instance',
     'Symbols',
@@ -0,0 +1,196 @@
+from collections import OrderedDict
+from typing import Callable
+
+
+class Cache:
+    """
+    Size-bounded cache with least-recently-used or least-frequently-used eviction and hit statistics.
+    The cache can also be bounded by the memory of its values, measured by sizeof.
+    """
+
+    policies = ('lru', 'lfu')
+    # lfu: use counts are halved after every `aging` hits or insertions per cached value
+    aging = 16
+
+    def __init__(self, max_size: int = None, max_memory: int = None, policy: str = 'lru', sizeof: Callable = None):
+        """
+        :param max_size: Maximum number of cached values, None for no limit
+        :param max_memory: Maximum memory of cached values in bytes, None for no limit
+        :param policy: lru evicts the least recently used value, and lfu evicts the least frequently used value,
+            where values used equally often are evicted in the order of their last use,
+            and use counts are aged so that values popular in the past do not stay forever
+        :param sizeof: Function that measures the memory of a value in bytes, required by max_memory
+        """
+        if max_size is None and max_memory is None:
+            raise ValueError('either max_size or max_memory of the cache should be given')
+        if max_size is not None and max_size <= 0:
+            raise ValueError(f'cache size should be positive, but {max_size} is given')
+        if max_memory is not None:
+            if max_memory <= 0:
+                raise ValueError(f'cache memory should be positive, but {max_memory} is given')
+            if sizeof is None:
+                raise ValueError('sizeof should be given to bound the cache memory')
+        if policy not in self.policies:
+            raise ValueError(f'unknown cache policy {policy}, available policies: {", ".join(self.policies)}')
+
+        self.max_size = max_size
+        self.max_memory = max_memory
+        self.policy = policy
+        self.sizeof = sizeof
+        self._data = OrderedDict()
+        self._sizes = dict()
+        self.memory = 0
+
+        # lfu: use count of each key, and keys grouped by use count in the order of their last use
+        self._counts = dict()
+        self._buckets = dict()
+        self._min_count = 0
+        # lfu: uses since the counts were aged
+        self._uses = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _add_to_bucket(self, key, count):
+        self._counts[key] = count
+        self._buckets.setdefault(count, OrderedDict())[key] = None
+        if not self._min_count or count < self._min_count:
+            self._min_count = count
+
+    def _remove_from_bucket(self, key):
+        count = self._counts.pop(key)
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+            if self._min_count == count:
+                self._min_count = min(self._buckets, default=0)
+        return count
+
+    def _age(self):
+        """
+        Halve the use counts, so that keys which were popular in the past are evicted once they are no longer used,
+        instead of blocking new popular keys forever
+        """
+        buckets = self._buckets
+        self._counts, self._buckets, self._min_count = dict(), dict(), 0
+        for count in sorted(buckets):
+            for key in buckets[count]:
+                self._add_to_bucket(key, max(count // 2, 1))
+        self._uses = 0
+
+    def _touch(self, key):
+        if self.policy == 'lru':
+            self._data.move_to_end(key)
+            return
+
+        self._add_to_bucket(key, self._remove_from_bucket(key) + 1)
+        self._use()
+
+    def _use(self):
+        # both hits and insertions age the counts, so that a cache full of old popular keys admits new ones
+        self._uses += 1
+        if self._uses >= self.aging * max(len(self._data), 1):
+            self._age()
+
+    def _remove(self, key):
+        """
+        :return: use count of the removed key, which is 0 for lru
+        """
+        del self._data[key]
+        self.memory -= self._sizes.pop(key, 0)
+        return self._remove_from_bucket(key) if self.policy == 'lfu' else 0
+
+    def _evict(self):
+        if self.policy == 'lru':
+            key = next(iter(self._data))
+        else:
+            key = next(iter(self._buckets[self._min_count]))
+        self._remove(key)
+        self.evictions += 1
+
+    def _is_full(self, size: int):
+        """
+        :param size: Memory of the value to be inserted
+        """
+        if self.max_size is not None and len(self._data) >= self.max_size:
+            return True
+        return self.max_memory is not None and self.memory + size > self.max_memory
+
+    def get(self, key, default=None):
+        if key in self._data:
+            self.hits += 1
+            self._touch(key)
+            return self._data[key]
+        self.misses += 1
+        return default
+
+    def set(self, key, value):
+        size = 0
+        if self.max_memory is not None:
+            size = self.sizeof(value)
+            if size > self.max_memory:
+                # a value larger than the memory budget is not cached, instead of evicting all values
+                return
+
+        # a replaced value keeps the use count of its key
+        count = self._remove(key) if key in self._data else 0
+        # values are evicted before inserting, so that the inserted key is never evicted by itself
+        while self._data and self._is_full(size):
+            self._evict()
+
+        self._data[key] = value
+        if self.max_memory is not None:
+            self.memory += size
+            self._sizes[key] = size
+        if self.policy == 'lfu':
+            self._add_to_bucket(key, count + 1)
+            self._use()
+
+    def clear(self, keep_stats: bool = False):
+        """
+        :param keep_stats: Keep the hit statistics, e.g., when the cached values are outdated rather than reset
+        """
+        self._data.clear()
+        self._sizes.clear()
+        self._counts.clear()
+        self._buckets.clear()
+        self._min_count = 0
+        self._uses = 0
+        self.memory = 0
+        if not keep_stats:
+            self.hits = self.misses = self.evictions = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        stats = {
+            'size': len(self),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+        }
+        if self.max_memory is not None:
+            stats.update(memory=self.memory, max_memory=self.max_memory)
+        if self.max_memory is not None or self.policy != 'lru':
+            stats.update(policy=self.policy, evictions=self.evictions)
+        return stats
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __str__(self):
+        if self.max_size is None:
+            return f'Cache(size={len(self)}, memory={self.memory}/{self.max_memory}, hit_rate={self.hit_rate:.2%})'
+        return f'Cache(size={len(self)}/{self.max_size}, hit_rate={self.hit_rate:.2%})'
+
+    def __repr__(self):
+        return str(self)
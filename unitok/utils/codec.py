@@ -0,0 +1,115 @@
+import lzma
+import zlib
+from typing import Type
+
+try:
+    import zstandard
+except ImportError:  # optional, faster codec
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # optional, faster codec
+    lz4_frame = None
+
+
+class Codec:
+    """
+    Compression codec of the stored token blocks
+    """
+
+    name = None
+    package = None  # pip package required by the codec, None for the standard library
+
+    @classmethod
+    def is_available(cls):
+        return True
+
+    @classmethod
+    def compress(cls, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    @classmethod
+    def decompress(cls, data: bytes) -> bytes:
+        raise NotImplementedError
+
+
+class ZlibCodec(Codec):
+    name = 'zlib'
+
+    @classmethod
+    def compress(cls, data: bytes) -> bytes:
+        return zlib.compress(data, 6)
+
+    @classmethod
+    def decompress(cls, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class LzmaCodec(Codec):
+    name = 'lzma'
+
+    @classmethod
+    def compress(cls, data: bytes) -> bytes:
+        return lzma.compress(data)
+
+    @classmethod
+    def decompress(cls, data: bytes) -> bytes:
+        return lzma.decompress(data)
+
+
+class ZstdCodec(Codec):
+    name = 'zstd'
+    package = 'zstandard'
+
+    @classmethod
+    def is_available(cls):
+        return zstandard is not None
+
+    @classmethod
+    def compress(cls, data: bytes) -> bytes:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+
+    @classmethod
+    def decompress(cls, data: bytes) -> bytes:
+        return zstandard.ZstdDecompressor().decompress(data)
+
+
+class Lz4Codec(Codec):
+    name = 'lz4'
+    package = 'lz4'
+
+    @classmethod
+    def is_available(cls):
+        return lz4_frame is not None
+
+    @classmethod
+    def compress(cls, data: bytes) -> bytes:
+        return lz4_frame.compress(data)
+
+    @classmethod
+    def decompress(cls, data: bytes) -> bytes:
+        return lz4_frame.decompress(data)
+
+
+class Codecs:
+    codecs = {codec.name: codec for codec in [ZlibCodec, LzmaCodec, ZstdCodec, Lz4Codec]}
+    # preference of the `fast` codec, falling back to zlib when no faster codec is installed
+    fast = [ZstdCodec, Lz4Codec, ZlibCodec]
+
+    @classmethod
+    def get(cls, name: str) -> Type[Codec]:
+        """
+        :param name: zlib, lzma, zstd, lz4, or fast for the fastest installed codec
+        """
+        if name == 'fast':
+            return next(codec for codec in cls.fast if codec.is_available())
+
+        if name not in cls.codecs:
+            raise ValueError(f'unknown codec {name}, available codecs: {", ".join(cls.codecs)}, fast')
+
+        codec = cls.codecs[name]
+        if not codec.is_available():
+            raise ValueError(f'codec {name} requires the {codec.package} package, '
+                             f'please install it by `pip install {codec.package}`')
+        return codec
@@ -0,0 +1,504 @@
+import bisect
+import itertools
+import threading
+from collections.abc import MutableMapping
+from typing import Callable, Iterable
+
+import numpy as np
+
+from unitok.utils.cache import Cache
+
+
+def take_grouped(column_class: type, groups: np.ndarray, fetch: Callable):
+    """
+    Gather rows grouped by their storage units, e.g., parts of a column or blocks of a BlockPart
+    :param groups: Storage unit of each gathered row
+    :param fetch: Function of (group, positions) that returns the arrays of the rows at the given positions
+    :return: arrays of the rows, in the order of groups
+    """
+    unique = np.unique(groups)
+    if len(unique) == 1:
+        return fetch(unique[0], np.arange(len(groups)))
+
+    pieces, order = [], []
+    for group in unique:
+        positions = np.flatnonzero(groups == group)
+        pieces.append(fetch(group, positions))
+        order.append(positions)
+    order = np.concatenate(order)
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(len(order))
+    return column_class.take(column_class.concat(pieces), inverse)
+
+
+class Column:
+    """
+    Token data of a feature stored in numpy arrays, e.g., loaded or memory-mapped from the saved segments
+    Each part is either arrays or a BlockPart of compressed arrays
+    Rows appended afterwards are held in a python list, so that the arrays are never copied
+    """
+
+    dtype = np.int64
+
+    def __init__(self, parts: list = None):
+        self.parts = []
+        self.bounds = [0]  # cumulative row numbers of the parts
+        self.tail = []
+        for part in parts or []:
+            self.add_part(part)
+
+    @staticmethod
+    def part_size(part) -> int:
+        raise NotImplementedError
+
+    @staticmethod
+    def get(part, index: int):
+        raise NotImplementedError
+
+    @staticmethod
+    def slice_part(part, start: int, end: int):
+        raise NotImplementedError
+
+    @staticmethod
+    def to_bytes(arrays) -> bytes:
+        raise NotImplementedError
+
+    @staticmethod
+    def from_bytes(data: bytes, size: int, dtype):
+        raise NotImplementedError
+
+    @classmethod
+    def from_lines(cls, lines: list):
+        """
+        :return: arrays of the python token lines
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def concat(cls, parts: list):
+        raise NotImplementedError
+
+    @classmethod
+    def take(cls, arrays, indices: np.ndarray):
+        """
+        :return: arrays of the rows at indices, gathered without converting to python objects
+        """
+        raise NotImplementedError
+
+    def add_part(self, part):
+        if self.tail:
+            raise ValueError('cannot add array part after rows are appended')
+        self.parts.append(part)
+        self.bounds.append(self.bounds[-1] + self._get_size(part))
+
+    def _get_size(self, part):
+        return len(part) if isinstance(part, BlockPart) else self.part_size(part)
+
+    def _get_row(self, part, index: int):
+        return part.get(index) if isinstance(part, BlockPart) else self.get(part, index)
+
+    def _slice(self, part, start: int, end: int):
+        return part.export(start, end) if isinstance(part, BlockPart) else self.slice_part(part, start, end)
+
+    def extend(self, lines):
+        self.tail.extend(lines)
+
+    def append(self, line):
+        self.tail.append(line)
+
+    def __len__(self):
+        return self.bounds[-1] + len(self.tail)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        index = int(index)
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError(f'index {index} out of range for column of size {len(self)}')
+
+        if index >= self.bounds[-1]:
+            return self.tail[index - self.bounds[-1]]
+        i = bisect.bisect_right(self.bounds, index) - 1
+        return self._get_row(self.parts[i], index - self.bounds[i])
+
+    def __iter__(self):
+        for i, part in enumerate(self.parts):
+            if isinstance(part, BlockPart):
+                # compressed blocks are streamed, each decompressed once
+                yield from part
+                continue
+            for index in range(self.bounds[i + 1] - self.bounds[i]):
+                yield self.get(part, index)
+        yield from self.tail
+
+    def gather(self, indices: np.ndarray):
+        """
+        :param indices: Non-negative row indices
+        :return: arrays of the rows at indices, which are gathered from the parts without converting to python objects
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if not len(indices):
+            return self.from_lines([])
+        # parts are numbered by their bounds, and rows in the tail belong to the extra part len(self.parts)
+        groups = np.searchsorted(self.bounds, indices, side='right') - 1
+
+        def fetch(i, positions):
+            rows = indices[positions] - self.bounds[i]
+            if i == len(self.parts):
+                return self.from_lines([self.tail[row] for row in rows])
+            part = self.parts[i]
+            if isinstance(part, BlockPart):
+                return part.gather(rows)
+            return self.take(part, rows)
+
+        return take_grouped(type(self), groups, fetch)
+
+    def export(self, start: int = 0, end: int = None):
+        """
+        :return: arrays of rows in [start, end), which are sliced from the parts without converting to python objects
+        """
+        end = len(self) if end is None else end
+        pieces = []
+        for i, part in enumerate(self.parts):
+            lower, upper = self.bounds[i], self.bounds[i + 1]
+            if upper <= start or lower >= end:
+                continue
+            pieces.append(self._slice(part, max(start, lower) - lower, min(end, upper) - lower))
+        if end > self.bounds[-1]:
+            pieces.append(self.from_lines(self.tail[max(start - self.bounds[-1], 0):end - self.bounds[-1]]))
+        if len(pieces) == 1:
+            return pieces[0]
+        return self.concat(pieces)
+
+    @staticmethod
+    def fit_dtype(values: np.ndarray, dtype):
+        """
+        :return: values cast to dtype, which is widened when any value is out of its range, e.g., negative digits
+        """
+        dtype = np.dtype(dtype)
+        if values.dtype == dtype or not values.size:
+            return values.astype(dtype, copy=False)
+        lower, upper = values.min(), values.max()
+        info = np.iinfo(dtype)
+        if lower < info.min or upper > info.max:
+            dtype = np.promote_types(np.min_scalar_type(lower), np.min_scalar_type(upper))
+        return values.astype(dtype, copy=False)
+
+    @classmethod
+    def astype(cls, arrays, dtype):
+        raise NotImplementedError
+
+    @classmethod
+    def export_lines(cls, lines, start: int = 0, end: int = None):
+        """
+        :param lines: python token lines or column
+        """
+        if isinstance(lines, Column):
+            return lines.export(start, end)
+        return cls.from_lines(lines[start:end])
+
+    def __str__(self):
+        return f'{self.__class__.__name__}(size={len(self)}, parts={len(self.parts)})'
+
+    def __repr__(self):
+        return str(self)
+
+
+class AtomColumn(Column):
+    """
+    Column of atomic token ids, stored in a flat array
+    """
+
+    @staticmethod
+    def part_size(part) -> int:
+        return len(part)
+
+    @staticmethod
+    def get(part, index: int):
+        return part[index].item()
+
+    @staticmethod
+    def slice_part(part, start: int, end: int):
+        return part[start:end]
+
+    @staticmethod
+    def to_bytes(arrays) -> bytes:
+        return arrays.tobytes()
+
+    @classmethod
+    def astype(cls, arrays, dtype):
+        return cls.fit_dtype(arrays, dtype)
+
+    @staticmethod
+    def from_bytes(data: bytes, size: int, dtype):
+        return np.frombuffer(data, dtype=dtype, count=size)
+
+    @classmethod
+    def from_lines(cls, lines: list):
+        return np.asarray(lines, dtype=cls.dtype)
+
+    @classmethod
+    def concat(cls, parts: list):
+        return np.concatenate(parts)
+
+    @classmethod
+    def take(cls, arrays, indices: np.ndarray):
+        return arrays[indices]
+
+
+class ListColumn(Column):
+    """
+    Column of token lists, stored in compressed sparse row format
+    Each part is a tuple of (values, offsets), where the i-th row is values[offsets[i]:offsets[i + 1]]
+    """
+
+    @staticmethod
+    def part_size(part) -> int:
+        return len(part[1]) - 1
+
+    @staticmethod
+    def get(part, index: int):
+        values, offsets = part
+        return values[offsets[index]:offsets[index + 1]].tolist()
+
+    @staticmethod
+    def slice_part(part, start: int, end: int):
+        values, offsets = part
+        offsets = offsets[start:end + 1]
+        return values[offsets[0]:offsets[-1]], offsets - offsets[0]
+
+    @classmethod
+    def astype(cls, arrays, dtype):
+        values, offsets = arrays
+        return cls.fit_dtype(values, dtype), offsets
+
+    @staticmethod
+    def to_bytes(arrays) -> bytes:
+        # offsets are stored before values, as their length is known from the number of rows
+        values, offsets = arrays
+        return offsets.astype(np.int64).tobytes() + values.tobytes()
+
+    @staticmethod
+    def from_bytes(data: bytes, size: int, dtype):
+        offsets = np.frombuffer(data, dtype=np.int64, count=size + 1)
+        values = np.frombuffer(data, dtype=dtype, offset=offsets.nbytes)
+        return values, offsets
+
+    @classmethod
+    def from_lines(cls, lines: list):
+        offsets = np.zeros(len(lines) + 1, dtype=np.int64)
+        np.cumsum([len(line) for line in lines], out=offsets[1:])
+        values = np.fromiter(itertools.chain.from_iterable(lines), dtype=cls.dtype, count=int(offsets[-1]))
+        return values, offsets
+
+    @classmethod
+    def concat(cls, parts: list):
+        values = np.concatenate([part[0] for part in parts])
+        offsets = [parts[0][1]]
+        for part in parts[1:]:
+            offsets.append(part[1][1:] + offsets[-1][-1])
+        return values, np.concatenate(offsets)
+
+    @classmethod
+    def take(cls, arrays, indices: np.ndarray):
+        values, offsets = arrays
+        starts = offsets[indices]
+        lengths = offsets[indices + 1] - starts
+        new_offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=new_offsets[1:])
+        # position of each gathered value in the values array, i.e., its row start plus its position in the row
+        positions = np.arange(new_offsets[-1]) + np.repeat(starts - new_offsets[:-1], lengths)
+        return values[positions], new_offsets
+
+    @staticmethod
+    def pad(arrays, width: int, pad_value: int = 0):
+        """
+        :param width: Number of columns of the padded matrix, longer rows are truncated
+        :return: padded matrix of the rows, and the lengths of the rows in the matrix
+        """
+        values, offsets = arrays
+        lengths = np.minimum(offsets[1:] - offsets[:-1], width)
+        dtype = np.promote_types(values.dtype, np.min_scalar_type(pad_value))
+        matrix = np.full((len(lengths), width), pad_value, dtype=dtype)
+
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        columns = np.arange(len(rows)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        matrix[rows, columns] = values[offsets[:-1][rows] + columns]
+        return matrix, lengths
+
+
+class BlockPart:
+    """
+    Rows of a feature compressed in fixed-size row blocks, with a block index of byte offsets
+    Only the blocks covering the accessed rows are decompressed, and the recently decompressed blocks are cached
+    """
+
+    def __init__(
+            self,
+            column_class: type,
+            blocks: np.ndarray,
+            index: np.ndarray,
+            codec: type,
+            block_size: int,
+            size: int,
+            dtype,
+            start: int = 0,
+            end: int = None,
+    ):
+        """
+        :param column_class: AtomColumn or ListColumn, which defines the layout of the rows
+        :param blocks: Concatenated compressed blocks, as a uint8 array
+        :param index: Byte offsets of the blocks, where the i-th block is blocks[index[i]:index[i + 1]]
+        :param codec: Codec of the blocks
+        :param size: Number of rows in all blocks
+        :param start: First row of the window, as a part can be a window of the blocks
+        """
+        self.column_class = column_class
+        self.blocks = blocks
+        self.index = index
+        self.codec = codec
+        self.block_size = block_size
+        self.size = size
+        self.dtype = dtype
+        self.start = start
+        self.end = size if end is None else end
+        self.cache = Cache(2)
+        # blocks can be decoded by the threads of UniTok.iter_batches, only the cache access is locked
+        self.lock = threading.Lock()
+
+    @classmethod
+    def encode(cls, column_class: type, arrays, codec: type, block_size: int):
+        """
+        :return: concatenated compressed blocks and the block index
+        """
+        size = column_class.part_size(arrays)
+        blocks, index = [], [0]
+        for start in range(0, size, block_size):
+            block = column_class.slice_part(arrays, start, min(start + block_size, size))
+            blocks.append(codec.compress(column_class.to_bytes(block)))
+            index.append(index[-1] + len(blocks[-1]))
+        return np.frombuffer(b''.join(blocks), dtype=np.uint8), np.array(index, dtype=np.int64)
+
+    def decode(self, block: int):
+        with self.lock:
+            arrays = self.cache.get(block)
+        if arrays is None:
+            size = min(self.block_size, self.size - block * self.block_size)
+            data = self.codec.decompress(self.blocks[self.index[block]:self.index[block + 1]].tobytes())
+            arrays = self.column_class.from_bytes(data, size, self.dtype)
+            with self.lock:
+                self.cache.set(block, arrays)
+        return arrays
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock'], state['cache']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.cache = Cache(2)
+        self.lock = threading.Lock()
+
+    def window(self, start: int, end: int):
+        return BlockPart(
+            self.column_class, self.blocks, self.index, self.codec, self.block_size, self.size, self.dtype,
+            start=self.start + start, end=self.start + end,
+        )
+
+    def __len__(self):
+        return self.end - self.start
+
+    def get(self, index: int):
+        block, row = divmod(self.start + index, self.block_size)
+        return self.column_class.get(self.decode(block), row)
+
+    def gather(self, indices: np.ndarray):
+        """
+        :return: arrays of the rows at indices of the window, where each covered block is decompressed once
+        """
+        rows = self.start + indices
+
+        def fetch(block, positions):
+            return self.column_class.take(self.decode(block), rows[positions] - block * self.block_size)
+
+        return take_grouped(self.column_class, rows // self.block_size, fetch)
+
+    def _iter_blocks(self, start: int, end: int):
+        """
+        :return: decompressed arrays of rows in [start, end) of the window, block by block
+        """
+        start, end = self.start + start, self.start + end
+        for block in range(start // self.block_size, (end - 1) // self.block_size + 1 if end > start else 0):
+            lower = block * self.block_size
+            arrays = self.decode(block)
+            yield arrays, max(start - lower, 0), min(end - lower, self.column_class.part_size(arrays))
+
+    def export(self, start: int, end: int):
+        pieces = []
+        for arrays, lower, upper in self._iter_blocks(start, end):
+            pieces.append(self.column_class.slice_part(arrays, lower, upper))
+        if not pieces:
+            return self.column_class.from_lines([])
+        return pieces[0] if len(pieces) == 1 else self.column_class.concat(pieces)
+
+    def __iter__(self):
+        for arrays, lower, upper in self._iter_blocks(0, len(self)):
+            for index in range(lower, upper):
+                yield self.column_class.get(arrays, index)
+
+
+class LazyData(MutableMapping):
+    """
+    Token data of features, where each feature is read by the loader when it is accessed for the first time
+    """
+
+    def __init__(self, loader: Callable, names: Iterable[str]):
+        """
+        :param loader: Function that reads the token data of a feature by its name
+        :param names: Names of the features that can be loaded
+        """
+        self._loader = loader
+        self._pending = dict.fromkeys(names)
+        self._data = dict()
+
+    @property
+    def loaded(self):
+        return list(self._data)
+
+    def __getitem__(self, name):
+        if name not in self._data:
+            if name not in self._pending:
+                raise KeyError(name)
+            self._data[name] = self._loader(name)
+            del self._pending[name]
+        return self._data[name]
+
+    def __setitem__(self, name, value):
+        self._pending.pop(name, None)
+        self._data[name] = value
+
+    def __delitem__(self, name):
+        if name in self._pending:
+            del self._pending[name]
+        else:
+            del self._data[name]
+
+    def __contains__(self, name):
+        return name in self._data or name in self._pending
+
+    def __iter__(self):
+        yield from list(self._data)
+        yield from list(self._pending)
+
+    def __len__(self):
+        return len(self._data) + len(self._pending)
+
+    def __str__(self):
+        return f'LazyData(loaded={len(self._data)}, pending={len(self._pending)})'
+
+    def __repr__(self):
+        return str(self)
@@ -1,6 +1,44 @@
 import random
 import string
+import sys
+
+import numpy as np
 
 
 def get_random_string(length):
     return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
+
+
+def get_slice(truncate):
+    if truncate is None:
+        truncate = 0
+    if truncate > 0:
+        return slice(0, truncate)
+    if truncate < 0:
+        return slice(truncate, None)
+    return slice(None)
+
+
+def get_sample_size(sample: dict) -> int:
+    """
+    :return: approximate memory of a packed sample in bytes, i.e., a dict of token ids and token lists
+    """
+    size = sys.getsizeof(sample)
+    for value in sample.values():
+        size += sys.getsizeof(value)
+        if isinstance(value, list):
+            size += sum(map(sys.getsizeof, value))
+    return size
+
+
+def get_dtype(vocab_size: int):
+    """
+    :return: the narrowest integer dtype that holds token ids of the vocabulary
+    """
+    if vocab_size <= np.iinfo(np.uint8).max + 1:
+        return np.dtype(np.uint8)
+    if vocab_size <= np.iinfo(np.uint16).max + 1:
+        return np.dtype(np.uint16)
+    if vocab_size <= np.iinfo(np.int32).max + 1:
+        return np.dtype(np.int32)
+    return np.dtype(np.int64)
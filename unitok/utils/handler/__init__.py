@@ -1,7 +1,11 @@
 from unitok.utils.handler.json_handler import JsonHandler
 from unitok.utils.handler.pkl_handler import PickleHandler
+from unitok.utils.handler.npy_handler import NumpyHandler
+from unitok.utils.handler.table_handler import TableHandler
 
 __all__ = [
     'JsonHandler',
     'PickleHandler',
+    'NumpyHandler',
+    'TableHandler',
 ]
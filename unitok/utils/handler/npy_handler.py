@@ -0,0 +1,17 @@
+import os
+
+import numpy as np
+
+
+class NumpyHandler:
+    @staticmethod
+    def load(path: str, mmap: bool = False):
+        return np.load(path, mmap_mode='r' if mmap else None, allow_pickle=False)
+
+    @staticmethod
+    def save(data: np.ndarray, path: str):
+        # write to a temporary file and replace, so that arrays memory-mapped from the old file stay valid
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'wb') as f:
+            np.save(f, data, allow_pickle=False)
+        os.replace(temp_path, path)
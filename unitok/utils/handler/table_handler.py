@@ -0,0 +1,87 @@
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+
+class TableHandler:
+    """
+    Write token arrays of features as a columnar table
+    Each column is a flat array for an atomic feature, or a tuple of (values, offsets) for a list feature
+    Table libraries are imported on use, as they are slow to import and only needed for exporting
+    """
+
+    @staticmethod
+    def has_pyarrow():
+        return importlib.util.find_spec('pyarrow') is not None
+
+    @classmethod
+    def import_pyarrow(cls):
+        # optional, required by the arrow export and native list columns in parquet
+        if not cls.has_pyarrow():
+            raise ValueError('pyarrow is required, please install it by `pip install pyarrow`')
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+        return pyarrow
+
+    @classmethod
+    def to_arrow(cls, columns: dict):
+        pyarrow = cls.import_pyarrow()
+        arrays = dict()
+        for name, column in columns.items():
+            if not isinstance(column, tuple):
+                arrays[name] = pyarrow.array(column)
+                continue
+            values, offsets = column
+            # list arrays share the values buffer, large lists are used when offsets overflow int32
+            if offsets[-1] > np.iinfo(np.int32).max:
+                arrays[name] = pyarrow.LargeListArray.from_arrays(offsets.astype(np.int64), values)
+            else:
+                arrays[name] = pyarrow.ListArray.from_arrays(offsets.astype(np.int32), values)
+        return pyarrow.table(arrays)
+
+    @classmethod
+    def save_arrow(cls, columns: dict, path: str):
+        pyarrow = cls.import_pyarrow()
+        table = cls.to_arrow(columns)
+        with pyarrow.OSFile(path, 'wb') as sink:
+            with pyarrow.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    @classmethod
+    def save_parquet(cls, columns: dict, path: str, engine: str = None, row_group_size: int = None):
+        """
+        :param engine: pyarrow, which writes list features as native list columns, or fastparquet,
+            which does not support nested columns and writes list features as json-encoded int lists.
+            None for pyarrow if installed, otherwise fastparquet
+        :param row_group_size: Number of rows in each row group, None for the default of the engine
+        """
+        if engine is None:
+            engine = 'pyarrow' if cls.has_pyarrow() else 'fastparquet'
+
+        if engine == 'pyarrow':
+            pyarrow = cls.import_pyarrow()
+            pyarrow.parquet.write_table(cls.to_arrow(columns), path, row_group_size=row_group_size)
+            return
+
+        if engine != 'fastparquet':
+            raise ValueError(f'unknown parquet engine {engine}, available engines: pyarrow, fastparquet')
+
+        import fastparquet
+
+        series, list_columns = dict(), []
+        for name, column in columns.items():
+            if not isinstance(column, tuple):
+                series[name] = column
+                continue
+            values, offsets = column
+            lines = [values[offsets[i]:offsets[i + 1]].tolist() for i in range(len(offsets) - 1)]
+            series[name] = pd.Series(lines, dtype=object)
+            list_columns.append(name)
+
+        kwargs = dict() if row_group_size is None else dict(row_group_offsets=row_group_size)
+        fastparquet.write(
+            path, pd.DataFrame(series), write_index=False,
+            object_encoding={name: 'json' for name in list_columns}, **kwargs
+        )
@@ -0,0 +1,59 @@
+import queue
+import threading
+from typing import Iterable
+
+
+class Prefetcher:
+    """
+    Iterate an iterable in a background thread, which produces the next items while the current one is consumed
+    e.g., reading the next chunk of a file while the current chunk is tokenized
+    """
+
+    _end = object()
+
+    def __init__(self, iterable: Iterable, size: int = 2):
+        """
+        :param iterable: Iterable whose items are produced in the background thread
+        :param size: Maximum number of items produced ahead of the consumer
+        """
+        if size <= 0:
+            raise ValueError(f'prefetch size should be positive, but {size} is given')
+        self.iterable = iterable
+        self.size = size
+
+    def __iter__(self):
+        items = queue.Queue(maxsize=self.size)
+        stopped = threading.Event()
+
+        def put(item):
+            # the producer gives up when the consumer stops early, e.g., by break
+            while not stopped.is_set():
+                try:
+                    items.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                for item in self.iterable:
+                    if not put((item, None)):
+                        return
+                put((self._end, None))
+            except BaseException as error:
+                put((self._end, error))
+
+        thread = threading.Thread(target=produce, daemon=True)
+        thread.start()
+        try:
+            while True:
+                item, error = items.get()
+                if error is not None:
+                    raise error
+                if item is self._end:
+                    return
+                yield item
+        finally:
+            stopped.set()
+            thread.join()
@@ -0,0 +1,75 @@
+import os
+from typing import Optional, Type
+
+import pandas as pd
+
+
+class Reader:
+    """
+    Read a table file as a stream of dataframe chunks, with only the given columns
+    """
+
+    suffixes = []
+
+    def __init__(self, filepath: str, columns: Optional[list] = None, read_size: int = 100_000, **kwargs):
+        """
+        :param columns: Columns to read, None for all columns
+        :param read_size: Number of rows in each chunk, if the format is not chunked by itself
+        :param kwargs: Options of the underlying reader
+        """
+        if read_size <= 0:
+            raise ValueError(f'read_size should be positive, but {read_size} is given')
+        self.filepath = filepath
+        self.columns = columns
+        self.read_size = read_size
+        self.kwargs = kwargs
+
+    def __iter__(self):
+        raise NotImplementedError
+
+
+class CsvReader(Reader):
+    suffixes = ['.csv', '.tsv']
+
+    def __iter__(self):
+        kwargs = dict(sep='\t' if self.filepath.endswith('.tsv') else ',')
+        kwargs.update(self.kwargs)
+        # at least one column is read to count the rows, e.g., when only the index column is tokenized
+        usecols = self.columns if self.columns is None or self.columns else [0]
+        with pd.read_csv(self.filepath, usecols=usecols, chunksize=self.read_size, **kwargs) as chunks:
+            yield from chunks
+
+
+class ParquetReader(Reader):
+    """
+    Read a parquet file by row groups, where only the column chunks of the given columns are read
+    """
+
+    suffixes = ['.parquet']
+
+    def __iter__(self):
+        import fastparquet
+
+        parquet = fastparquet.ParquetFile(self.filepath, **self.kwargs)
+        columns = self.columns if self.columns is None or self.columns else parquet.columns[:1]
+        for df in parquet.iter_row_groups(columns=columns):
+            # large row groups are split, so that the tokenization of a chunk is not blocked by a whole row group
+            for start in range(0, len(df), self.read_size):
+                yield df.iloc[start:start + self.read_size]
+
+
+class Readers:
+    readers = [CsvReader, ParquetReader]
+
+    @classmethod
+    def get_class(cls, filepath: str) -> Type[Reader]:
+        suffix = os.path.splitext(filepath)[1].lower()
+        for reader in cls.readers:
+            if suffix in reader.suffixes:
+                return reader
+        suffixes = ', '.join(suffix for reader in cls.readers for suffix in reader.suffixes)
+        raise ValueError(f'Unsupported file format: {filepath}, available formats: {suffixes}')
+
+    @classmethod
+    def get(cls, filepath: str, columns: Optional[list] = None, read_size: int = 100_000, **kwargs) -> Reader:
+        return cls.get_class(filepath)(filepath, columns=columns, read_size=read_size, **kwargs)
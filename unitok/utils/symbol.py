@@ -21,3 +21,7 @@ class Symbols:
     tokenized = Symbol('tokenized')
     organized = Symbol('organized')
 
+
+    # save layout
+
+    keep = Symbol('keep')
@@ -6,6 +6,10 @@ class Counter:
         self._activate = False
         self._count = dict()
 
+    @property
+    def is_active(self):
+        return self._activate
+
     def activate(self):
         self._activate = True
         return self
@@ -29,6 +33,20 @@ class Counter:
             assert isinstance(index, int)
             self._count[index] = self._count.get(index, 0) + 1
 
+    def export(self) -> dict:
+        return dict(self._count)
+
+    def update(self, counts: dict):
+        """
+        merge counts collected elsewhere, e.g., by a shard-local copy of the vocabulary
+        """
+        if not self._activate:
+            return self
+
+        for index, count in counts.items():
+            self._count[index] = self._count.get(index, 0) + count
+        return self
+
     def trim(self, min_count):
         """
         trim vocab by min frequency
@@ -0,0 +1,70 @@
+import numpy as np
+
+from unitok.utils import Map
+
+
+class TokenBuffer:
+    """
+    Tokens of a vocabulary stored as UTF-8 bytes joined by line breaks, with the byte offset of each token,
+    e.g., memory-mapped from the binary vocabulary files
+    Tokens appended afterwards are held in a python list
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        """
+        :param data: UTF-8 bytes of the tokens joined by line breaks, as a uint8 array
+        :param offsets: Byte offsets of the tokens, where the last one is len(data) + 1
+        """
+        self.data = data
+        self.offsets = offsets
+        self.tail = []
+
+    @classmethod
+    def encode(cls, tokens: list):
+        """
+        :return: data and offsets arrays of the tokens, which never contain line breaks
+        """
+        encoded = [token.encode('utf-8') for token in tokens]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(token) + 1 for token in encoded], out=offsets[1:])
+        return np.frombuffer(b'\n'.join(encoded), dtype=np.uint8), offsets
+
+    @property
+    def base_size(self):
+        return len(self.offsets) - 1
+
+    def export(self):
+        if not self.tail:
+            return self.data, self.offsets
+        return self.encode(list(self))
+
+    def build_index(self) -> Map:
+        """
+        :return: token to index map, decoding the buffer at once
+        """
+        tokens = self.data.tobytes().decode('utf-8').split('\n') if self.base_size else []
+        o2i = Map(zip(tokens, range(self.base_size)))
+        o2i.update(zip(self.tail, range(self.base_size, len(self))))
+        return o2i
+
+    def __len__(self):
+        return self.base_size + len(self.tail)
+
+    def __getitem__(self, index: int):
+        if index < 0 or index >= len(self):
+            raise KeyError(index)
+        if index >= self.base_size:
+            return self.tail[index - self.base_size]
+        return self.data[self.offsets[index]:self.offsets[index + 1] - 1].tobytes().decode('utf-8')
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __setitem__(self, index: int, token: str):
+        if index != len(self):
+            raise ValueError(f'tokens can only be appended, expected index {len(self)} but {index} is given')
+        self.tail.append(token)
+
+    def __contains__(self, index: int):
+        return 0 <= index < len(self)
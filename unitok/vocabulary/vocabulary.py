@@ -3,8 +3,10 @@ from typing import Optional, Union
 
 from unitok import PickleHandler
 from unitok.utils import Map, Instance
+from unitok.utils.handler import NumpyHandler
 from unitok.utils.hub import Hub
 from unitok.vocabulary.counter import Counter
+from unitok.vocabulary.token_buffer import TokenBuffer
 
 
 class Vocabulary:
@@ -14,10 +16,15 @@ class Vocabulary:
 
     def __init__(self, name: str):
         self._name = str(name)
+        self._o2i = None
         self.o2i, self.i2o = Map(), Map()
 
         self._editable = True  # whether vocab is editable
         self.counter = Counter()
+        # directory and size of the binary files when last loaded or saved, to skip saving an unchanged vocabulary
+        self._saved = None
+        # increased when tokens are removed or reindexed, which outdates the token ids cached by tokenizers
+        self.edition = 0
 
         VocabularyHub.add(self)
 
@@ -28,6 +35,17 @@ class Vocabulary:
     def name(self):
         return self._name
 
+    @property
+    def o2i(self):
+        # the token to index map of a loaded vocabulary is built when tokens are looked up for the first time
+        if self._o2i is None:
+            self._o2i = self.i2o.build_index()
+        return self._o2i
+
+    @o2i.setter
+    def o2i(self, value):
+        self._o2i = value
+
     # add name setter
     @name.setter
     def name(self, value):
@@ -67,6 +85,24 @@ class Vocabulary:
         self.counter(index)
         return index
 
+    def shrink(self, size: int):
+        """
+        Remove the tokens appended after the vocabulary had `size` tokens, e.g., to undo a failed tokenization
+        """
+        if isinstance(self.i2o, TokenBuffer) and size < self.i2o.base_size:
+            raise ValueError(f'loaded tokens of vocab {self.name} cannot be removed')
+        for index in range(size, len(self)):
+            if self._o2i is not None:
+                del self._o2i[self.i2o[index]]
+            if not isinstance(self.i2o, TokenBuffer):
+                del self.i2o[index]
+        if isinstance(self.i2o, TokenBuffer):
+            del self.i2o.tail[size - self.i2o.base_size:]
+        if self._saved is not None and size < self._saved[1]:
+            self._saved = None
+        self.edition += 1
+        return self
+
     @property
     def size(self):
         return len(self)
@@ -113,6 +149,8 @@ class Vocabulary:
         valid_objs = [self.i2o[index] for index in valid_indices]
 
         self.o2i, self.i2o = Map(), Map()
+        self._saved = None
+        self.edition += 1
         self.counter.deactivate()
         editable = self._editable
         self.allow_edit().extend(valid_objs)
@@ -121,6 +159,36 @@ class Vocabulary:
     def summarize(self, base=10):
         return self.counter.summarize(base=base)
 
+    """
+    Shard Methods
+    """
+
+    def export_shard(self, offset: int):
+        """
+        export the state of a shard-local copy of the vocab, which had `offset` tokens when it was copied
+        :return: newly appended tokens in order, and counter statistics
+        """
+        return [self.i2o[index] for index in range(offset, len(self))], self.counter.export()
+
+    def merge_shard(self, objs: list, counts: dict, offset: int):
+        """
+        merge the exported state of a shard-local copy of the vocab
+        :return: index mapping, where the shard-local index `offset + k` is mapped to the k-th index
+        """
+        mapping = []
+        for obj in objs:
+            if obj not in self.o2i:
+                index = len(self)
+                self.o2i[obj] = index
+                self.i2o[index] = obj
+            mapping.append(self.o2i[obj])
+
+        self.counter.update({
+            (index if index < offset else mapping[index - offset]): count
+            for index, count in counts.items()
+        })
+        return mapping
+
     """
     Save & Load Methods
     """
@@ -132,8 +200,26 @@ class Vocabulary:
     def filename(self):
         return f'{self.name}.vocab'
 
-    def load(self, save_dir: str):
+    def binary_filepaths(self, save_dir):
+        """
+        :return: paths of the token bytes and the token offsets of the binary vocabulary
+        """
+        filepath = self.filepath(save_dir)
+        return f'{filepath}.tokens.npy', f'{filepath}.offsets.npy'
+
+    def load(self, save_dir: str, mmap: bool = False):
+        """
+        Load the binary vocabulary, or the legacy pickled vocabulary
+        :param save_dir: Directory of the vocabulary, or path of a legacy .vocab file
+        :param mmap: Memory-map the token bytes instead of reading them into memory
+        """
         if not save_dir.endswith('.vocab'):
+            tokens_path, offsets_path = self.binary_filepaths(save_dir)
+            if os.path.exists(tokens_path):
+                self.i2o = TokenBuffer(NumpyHandler.load(tokens_path, mmap=mmap), NumpyHandler.load(offsets_path))
+                self.o2i = None
+                self._saved = (os.path.abspath(save_dir), len(self))
+                return self
             save_dir = self.filepath(save_dir)
 
         self.o2i, self.i2o = {}, {}
@@ -144,10 +230,38 @@ class Vocabulary:
 
         return self
 
-    def save(self, save_dir):
-        store_path = self.filepath(save_dir)
-        PickleHandler.save(list(self), store_path)
+    def is_saved(self, save_dir) -> bool:
+        """
+        :return: whether the binary files in save_dir are up to date, i.e., no token is added since loaded or saved
+        """
+        if self._saved != (os.path.abspath(save_dir), len(self)):
+            return False
+        return all(map(os.path.exists, self.binary_filepaths(save_dir)))
 
+    def remove(self, save_dir):
+        """
+        Remove the saved files of the vocabulary, e.g., when the vocabulary is no longer used by the table
+        """
+        for filepath in (*self.binary_filepaths(save_dir), self.filepath(save_dir)):
+            if os.path.exists(filepath):
+                os.remove(filepath)
+        return self
+
+    def save(self, save_dir):
+        tokens_path, offsets_path = self.binary_filepaths(save_dir)
+        if isinstance(self.i2o, TokenBuffer):
+            # tokens of a loaded vocabulary are saved without decoding
+            data, offsets = self.i2o.export()
+        else:
+            data, offsets = TokenBuffer.encode(list(self))
+        NumpyHandler.save(data, tokens_path)
+        NumpyHandler.save(offsets, offsets_path)
+
+        legacy_path = self.filepath(save_dir)
+        if os.path.exists(legacy_path):
+            os.remove(legacy_path)
+
+        self._saved = (os.path.abspath(save_dir), len(self))
         return self
 
     def json(self):